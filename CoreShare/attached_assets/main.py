@@ -1,10 +1,575 @@
+# Performance: this module is UI composition, not numeric code. Changes that
+# aim at speed should reduce renderer traffic (reuse controls, update only the
+# subtree that changed, avoid page.clean()/page.add() rebuilds) rather than
+# add JIT or compiled extensions. See PERF.md ("Why not Numba here").
+
+import hashlib
+import hmac
+import os
+import sqlite3
+import threading
+from collections import namedtuple
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import Callable, Optional
+
 import flet as ft
 
-# Simulated user database (replace with a real database in production)
-users = {
-    "renter@example.com": {"password": "renter123", "role": "renter"},
-    "rentee@example.com": {"password": "rentee123", "role": "rentee"},
-}
+# Define custom colors and styles
+PRIMARY_COLOR = "#3b82f6"  # Brighter blue
+SECONDARY_COLOR = "#1d4ed8"
+CARD_COLOR = "#1e293b"  # Slightly darker background
+TEXT_COLOR = "#f8fafc"  # Brighter white
+ACCENT_COLOR = "#60a5fa"  # Lighter blue for accents
+
+# Translucent colors used throughout the views, evaluated once
+_PRIMARY_05 = ft.colors.with_opacity(0.05, PRIMARY_COLOR)
+_PRIMARY_10 = ft.colors.with_opacity(0.1, PRIMARY_COLOR)
+_PRIMARY_20 = ft.colors.with_opacity(0.2, PRIMARY_COLOR)
+_PRIMARY_85 = ft.colors.with_opacity(0.85, PRIMARY_COLOR)
+_WHITE_05 = ft.colors.with_opacity(0.05, ft.colors.WHITE)
+_WHITE_10 = ft.colors.with_opacity(0.1, ft.colors.WHITE)
+_WHITE_20 = ft.colors.with_opacity(0.2, ft.colors.WHITE)
+_WHITE_70 = ft.colors.with_opacity(0.7, ft.colors.WHITE)
+_WHITE_80 = ft.colors.with_opacity(0.8, ft.colors.WHITE)
+_BLACK_15 = ft.colors.with_opacity(0.15, ft.colors.BLACK)
+_BLACK_20 = ft.colors.with_opacity(0.2, ft.colors.BLACK)
+HOVER_COLOR = _PRIMARY_10
+
+# Shared style objects, built once and reused by every widget
+_BTN_PADDING = ft.padding.only(top=12, bottom=12, left=20, right=20)
+_ROUNDED_10 = ft.RoundedRectangleBorder(radius=10)
+_BTN_ELEVATION = {"": 0, "hovered": 3}
+_PRIMARY_BUTTON_STYLE = ft.ButtonStyle(
+    bgcolor={
+        "": PRIMARY_COLOR,
+        "hovered": _PRIMARY_85,
+    },
+    color=TEXT_COLOR,
+    padding=_BTN_PADDING,
+    animation_duration=200,
+    shape=_ROUNDED_10,
+    elevation=_BTN_ELEVATION,
+    shadow_color=_PRIMARY_20,
+)
+_FORM_BUTTON_STYLE = ft.ButtonStyle(
+    bgcolor=ft.colors.BLUE_800,
+    color=ft.colors.WHITE,
+    padding=15,
+    shape=_ROUNDED_10,
+)
+_FIELD_LABEL_STYLE = ft.TextStyle(color=_WHITE_70)
+_FIELD_TEXT_STYLE = ft.TextStyle(color=ft.colors.WHITE, size=16)
+_REG_LABEL_STYLE = ft.TextStyle(color=ft.colors.GREY_400)
+_REG_TEXT_STYLE = ft.TextStyle(color=ft.colors.WHITE)
+
+# Dashboard card styling, identical for every card
+_CARD_SHADOW = ft.BoxShadow(
+    spread_radius=0,
+    blur_radius=15,
+    color=_BLACK_15,
+    offset=ft.Offset(2, 2),
+)
+_CARD_GRADIENT = ft.LinearGradient(
+    begin=ft.alignment.top_left,
+    end=ft.alignment.bottom_right,
+    colors=[
+        _PRIMARY_05,
+        "transparent",
+    ],
+)
+_CARD_BUTTON_MARGIN = ft.margin.only(top=10)
+
+# Short ease-out-cubic transitions keep the cards feeling responsive; the
+# sidebar keeps a longer curve so its width change stays readable
+_FAST_ANIM = ft.animation.Animation(180, ft.AnimationCurve.EASE_OUT_CUBIC)
+_NAV_ANIM = ft.animation.Animation(300, ft.AnimationCurve.EASE_OUT)
+
+# Navigation Items
+NavItem = namedtuple("NavItem", "icon label")
+nav_items = [
+    NavItem(ft.icons.DASHBOARD, "Dashboard"),
+    NavItem(ft.icons.MICROWAVE, "My GPUs"),
+    NavItem(ft.icons.DATA_USAGE, "Usage"),
+    NavItem(ft.icons.MONEY, "Income"),
+]
+
+
+@dataclass(slots=True, frozen=True)
+class Instance:
+    """A rented GPU instance; slotted so long instance lists stay compact."""
+    gpu: str
+    task: str
+    duration: str
+    status: str
+    price: str
+
+
+# Column values shown by each Active Instances view, in column order
+_INSTANCE_COLUMNS = attrgetter("gpu", "task", "duration", "status", "price")
+_MOBILE_INSTANCE_COLUMNS = attrgetter("gpu", "task", "duration", "price")  # No status column
+INSTANCE_HEADER = ("GPU", "Task", "Duration", "Status", "Price")  # Column labels
+
+# Simulated active instances
+active_instances = [
+    Instance("RTX 4090", "ML Training", "8h 23m", "Running", "Ksh15/h"),
+    Instance("RTX 3080", "Rendering", "2h 43m", "Running", "Ksh8/h"),
+]
+INSTANCE_ROW_POOL = 10  # Rows initially built for each Active Instances table
+ESTIMATE_ROW_HEIGHT = 52  # Fixed height of a renter instance list row
+HEADER_ROW_HEIGHT = 56
+VISIBLE_INSTANCE_ROWS = 5  # Rows shown in the renter instance list viewport
+OVERSCAN = 5  # Extra rows built beyond the viewport
+
+
+# Passwords are stored as salted scrypt digests, never in plain text
+def hash_password(password, salt=None):
+    if salt is None:
+        salt = os.urandom(16)
+    pw_hash = hashlib.scrypt(password.encode(), salt=salt, n=16384, r=8, p=1)
+    return pw_hash, salt
+
+
+def verify_password(record, password):
+    pw_hash, _ = hash_password(password, record["salt"])
+    # Constant-time comparison so response time doesn't leak the digest
+    return hmac.compare_digest(record["pw_hash"], pw_hash)
+
+
+# Users are kept in a SQLite database next to this file so registrations
+# survive restarts. Emails are stored lower-cased so lookups are
+# case-insensitive. sqlite3 caches the prepared statements per connection.
+USERS_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.db")
+_FIND_USER_SQL = "SELECT pw_hash, salt, role FROM users WHERE email = ?"
+_INSERT_USER_SQL = "INSERT INTO users (email, pw_hash, salt, role) VALUES (?, ?, ?, ?)"
+# Demo accounts created on first run (replace with real accounts in production)
+DEMO_USERS = (
+    ("renter@example.com", "renter123", "renter"),
+    ("rentee@example.com", "rentee123", "rentee"),
+)
+
+
+def open_users_db(path):
+    # Sessions run on different threads, so the connection is shared and
+    # guarded by users_lock
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    with conn:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "email TEXT PRIMARY KEY, pw_hash BLOB NOT NULL, salt BLOB NOT NULL, role TEXT NOT NULL)"
+        )
+    return conn
+
+
+def find_user(email):
+    with users_lock:
+        return users_db.execute(_FIND_USER_SQL, (email,)).fetchone()
+
+
+# Returns False if the email is already registered
+def add_user(email, password, role):
+    pw_hash, salt = hash_password(password)
+    with users_lock:
+        try:
+            with users_db:
+                users_db.execute(_INSERT_USER_SQL, (email, pw_hash, salt, role))
+        except sqlite3.IntegrityError:
+            return False
+    return True
+
+
+users_db = open_users_db(USERS_DB_PATH)
+users_lock = threading.Lock()
+for demo_email, demo_password, demo_role in DEMO_USERS:
+    if find_user(demo_email) is None:
+        add_user(demo_email, demo_password, demo_role)
+
+
+@dataclass
+class AppState:
+    """Mutable UI state shared by the event handlers in main()."""
+    is_authenticated: bool = False
+    user_role: Optional[str] = None
+    sidebar_expanded: bool = False
+    selected_nav_index: int = 0  # Tracks the selected navigation item
+    instances: list = field(default_factory=list)  # Instances currently shown
+
+
+@dataclass
+class ViewCtx:
+    """Controls and control factories handed from main() to the module-level view builders."""
+    instances_table: ft.DataTable  # Desktop dashboard only
+    mobile_instances_table: ft.DataTable  # Mobile dashboard only
+    # Controls used by several views are built per view, as a control can
+    # only have one parent
+    new_search_field: Callable[..., ft.TextField]
+    new_dashboard_cards: Callable[[], list]
+
+
+# Enhanced dashboard card styling
+def dashboard_card(icon, title, subtitle, button):
+    return ft.Container(
+        content=ft.Column(
+            controls=[
+                ft.Container(
+                    content=ft.Icon(icon, size=32, color=PRIMARY_COLOR),
+                    bgcolor=_PRIMARY_10,
+                    padding=15,
+                    border_radius=12,
+                    animate=_FAST_ANIM,
+                    ink=True,  # Add ripple effect
+                ),
+                ft.Text(
+                    title,
+                    color=TEXT_COLOR,
+                    size=20,
+                    weight="bold",
+                    text_align=ft.TextAlign.CENTER,
+                ),
+                ft.Text(
+                    subtitle,
+                    color=_WHITE_80,
+                    size=14,
+                    text_align=ft.TextAlign.CENTER,
+                ),
+                ft.Container(
+                    content=button,
+                    animate=_FAST_ANIM,
+                    margin=_CARD_BUTTON_MARGIN,
+                ),
+            ],
+            alignment=ft.MainAxisAlignment.CENTER,
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            spacing=15,
+        ),
+        padding=25,
+        bgcolor=CARD_COLOR,
+        border_radius=15,
+        width=300,  # Slightly wider
+        height=260,  # Slightly taller
+        shadow=_CARD_SHADOW,
+        animate=_FAST_ANIM,
+        gradient=_CARD_GRADIENT,
+    )
+
+
+# Define the dashboard view function
+def get_dashboard_view(ctx):
+    return ft.Column(
+        [
+            # Header section
+            ft.Container(
+                ft.Column(
+                    [
+                        ft.Text(
+                            "Active Resources",
+                            size=24,
+                            weight="bold",
+                            color=TEXT_COLOR
+                        ),
+                        ft.Container(
+                            content=ctx.new_search_field(width=300),
+                            margin=ft.margin.only(top=10, bottom=5),
+                        ),
+                    ],
+                ),
+                margin=ft.margin.only(left=16, right=16, top=20, bottom=10),
+            ),
+
+            # Cards section
+            ft.Container(
+                ft.Row(
+                    ctx.new_dashboard_cards(),
+                    scroll=ft.ScrollMode.AUTO,  # Enable horizontal scrolling
+                    spacing=16,
+                ),
+                padding=16,
+            ),
+
+            # Table section
+            ft.Container(
+                ft.Column(
+                    [
+                        ft.Text(
+                            "Active Instances",
+                            size=24,
+                            color=TEXT_COLOR,
+                            weight="bold"
+                        ),
+                        ft.Container(
+                            content=ctx.instances_table,
+                            padding=16,
+                            border_radius=12,
+                            bgcolor=CARD_COLOR,
+                        ),
+                    ],
+                    spacing=16,
+                ),
+                margin=ft.margin.only(left=16, right=16),
+                padding=ft.padding.only(top=16, bottom=16),
+            ),
+        ],
+        scroll=ft.ScrollMode.HIDDEN,
+        expand=True,
+    )
+
+
+# Row of the renter Active Instances list, styled like a table row. The
+# header row is given the column labels instead of an Instance
+def instance_list_row(instance, header=False):
+    values = instance if header else _INSTANCE_COLUMNS(instance)
+    cells = [
+        ft.Container(
+            ft.Text(
+                value,
+                size=16 if header else None,
+                weight="bold" if header else None,
+                text_align=ft.TextAlign.RIGHT if i == len(values) - 1 else None,  # Price is numeric
+            ),
+            expand=True,
+        )
+        for i, value in enumerate(values)
+    ]
+    return ft.Container(
+        ft.Row(cells, spacing=40),
+        height=HEADER_ROW_HEIGHT if header else ESTIMATE_ROW_HEIGHT,
+        padding=ft.padding.symmetric(horizontal=16),
+        bgcolor=_PRIMARY_10 if header else None,
+        border_radius=ft.border_radius.vertical(top=12) if header else None,
+        border=None if header else ft.border.only(bottom=ft.border.BorderSide(1, _WHITE_10)),
+    )
+
+
+# Mobile-specific views
+#
+# Leaf controls (dividers, icons, static texts) are created per view rather
+# than shared: Flet gives each control instance a single id and parent, so
+# one instance can't appear twice in a view (e.g. the two payment icons), and
+# module-level instances would be shared between sessions. Only immutable
+# style values are shared; views themselves are built once and cached.
+def mobile_dashboard_view(ctx):
+    return ft.Column(
+        [
+            # Mobile Header
+            ft.Container(
+                ft.Text(
+                    "Dashboard",
+                    size=28,
+                    weight="bold",
+                    color=TEXT_COLOR
+                ),
+                margin=ft.margin.only(left=16, top=20, bottom=16),
+            ),
+
+            # Search bar
+            ft.Container(
+                content=ctx.new_search_field(),
+                margin=ft.margin.symmetric(horizontal=16),
+            ),
+
+            # Stats Cards - Vertical layout for mobile
+            ft.Container(
+                ft.Column(ctx.new_dashboard_cards(), spacing=16),
+                padding=16,
+            ),
+
+            # Active Instances Table
+            ft.Container(
+                ft.Column(
+                    [
+                        ft.Text(
+                            "Active Instances",
+                            size=20,
+                            weight="bold",
+                            color=TEXT_COLOR
+                        ),
+                        ft.Container(
+                            content=ctx.mobile_instances_table,
+                            padding=8,
+                            border_radius=8,
+                            bgcolor=CARD_COLOR,
+                        ),
+                    ],
+                    spacing=16,
+                ),
+                margin=ft.margin.all(16),
+            ),
+        ],
+        scroll=ft.ScrollMode.HIDDEN,
+        expand=True,
+    )
+
+
+def mobile_gpus_view(ctx):
+    return ft.Column(
+        [
+            ft.Container(
+                ft.Text(
+                    "My GPUs",
+                    size=28,
+                    weight="bold",
+                    color=TEXT_COLOR
+                ),
+                margin=ft.margin.only(left=16, top=20, bottom=16),
+            ),
+            ft.Container(
+                ft.Column(
+                    [
+                        # GPU Card
+                        ft.Card(
+                            content=ft.Container(
+                                ft.Column(
+                                    [
+                                        ft.Row(
+                                            [
+                                                ft.Icon(ft.icons.MEMORY, color=PRIMARY_COLOR, size=24),
+                                                ft.Text("RTX 4090", size=18, weight="bold", color=TEXT_COLOR),
+                                                ft.Container(
+                                                    ft.Text("Active", size=12),
+                                                    bgcolor=ft.colors.GREEN_700,
+                                                    border_radius=12,
+                                                    padding=8,
+                                                ),
+                                            ],
+                                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                                        ),
+                                        ft.Divider(height=16, color=_WHITE_10),
+                                        ft.Row(
+                                            [
+                                                ft.Text("Temperature: 65°C"),
+                                                ft.Text("Memory: 18GB/24GB"),
+                                            ],
+                                            alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
+                                        ),
+                                    ],
+                                ),
+                                padding=16,
+                            ),
+                        ),
+                    ],
+                    spacing=16,
+                ),
+                margin=ft.margin.all(16),
+            ),
+        ],
+        scroll=ft.ScrollMode.HIDDEN,
+        expand=True,
+    )
+
+
+def mobile_usage_view(ctx):
+    return ft.Column(
+        [
+            ft.Container(
+                ft.Text(
+                    "Usage Stats",
+                    size=28,
+                    weight="bold",
+                    color=TEXT_COLOR
+                ),
+                margin=ft.margin.only(left=16, top=20, bottom=16),
+            ),
+            ft.Container(
+                ft.Column(
+                    [
+                        # Usage Stats Cards
+                        ft.Card(
+                            content=ft.Container(
+                                ft.Column(
+                                    [
+                                        ft.Text("Total Usage Time", size=16, color=ft.colors.GREY_400),
+                                        ft.Text("324 hours", size=24, weight="bold", color=TEXT_COLOR),
+                                        ft.ProgressBar(value=0.75, bgcolor=_PRIMARY_10, color=PRIMARY_COLOR),
+                                    ],
+                                ),
+                                padding=16,
+                            ),
+                        ),
+                        ft.Card(
+                            content=ft.Container(
+                                ft.Column(
+                                    [
+                                        ft.Text("Cost Overview", size=16, color=ft.colors.GREY_400),
+                                        ft.Text("Ksh 4,860", size=24, weight="bold", color=TEXT_COLOR),
+                                        ft.Text("This month", size=14, color=ft.colors.GREY_400),
+                                    ],
+                                ),
+                                padding=16,
+                            ),
+                        ),
+                    ],
+                    spacing=16,
+                ),
+                margin=ft.margin.all(16),
+            ),
+        ],
+        scroll=ft.ScrollMode.HIDDEN,
+        expand=True,
+    )
+
+
+def mobile_income_view(ctx):
+    return ft.Column(
+        [
+            ft.Container(
+                ft.Text(
+                    "Income",
+                    size=28,
+                    weight="bold",
+                    color=TEXT_COLOR
+                ),
+                margin=ft.margin.only(left=16, top=20, bottom=16),
+            ),
+            ft.Container(
+                ft.Column(
+                    [
+                        # Income Overview Card
+                        ft.Card(
+                            content=ft.Container(
+                                ft.Column(
+                                    [
+                                        ft.Text("Total Earnings", size=16, color=ft.colors.GREY_400),
+                                        ft.Text("Ksh 12,450", size=24, weight="bold", color=TEXT_COLOR),
+                                        ft.Text("Last 30 days", size=14, color=ft.colors.GREY_400),
+                                    ],
+                                ),
+                                padding=16,
+                            ),
+                        ),
+                        # Recent Transactions
+                        ft.Card(
+                            content=ft.Container(
+                                ft.Column(
+                                    [
+                                        ft.Text("Recent Transactions", size=16, weight="bold", color=TEXT_COLOR),
+                                        ft.ListTile(
+                                            leading=ft.Icon(ft.icons.PAYMENT, color=PRIMARY_COLOR),
+                                            title=ft.Text("Payment Received"),
+                                            subtitle=ft.Text("From: User123"),
+                                            trailing=ft.Text("Ksh 1,500"),
+                                        ),
+                                        ft.ListTile(
+                                            leading=ft.Icon(ft.icons.PAYMENT, color=PRIMARY_COLOR),
+                                            title=ft.Text("Payment Received"),
+                                            subtitle=ft.Text("From: User456"),
+                                            trailing=ft.Text("Ksh 2,300"),
+                                        ),
+                                    ],
+                                ),
+                                padding=16,
+                            ),
+                        ),
+                    ],
+                    spacing=16,
+                ),
+                margin=ft.margin.all(16),
+            ),
+        ],
+        scroll=ft.ScrollMode.HIDDEN,
+        expand=True,
+
+    )
 
 
 # Main App Function
@@ -18,37 +583,46 @@ def main(page: ft.Page):
     page.bgcolor = ft.colors.GREY_900
     page.window.min_width = 500
 
-    # Define custom colors and styles
-    PRIMARY_COLOR = "#3b82f6"  # Brighter blue
-    SECONDARY_COLOR = "#1d4ed8"
-    CARD_COLOR = "#1e293b"  # Slightly darker background
-    TEXT_COLOR = "#f8fafc"  # Brighter white
-    ACCENT_COLOR = "#60a5fa"  # Lighter blue for accents
-    HOVER_COLOR = ft.colors.with_opacity(0.1, PRIMARY_COLOR)
-
     # Custom button style with improved aesthetics
     def custom_button_style(bg_color=PRIMARY_COLOR):
+        if bg_color == PRIMARY_COLOR:
+            return _PRIMARY_BUTTON_STYLE
         return ft.ButtonStyle(
             bgcolor={
                 "": bg_color,
                 "hovered": ft.colors.with_opacity(0.85, bg_color),
             },
             color=TEXT_COLOR,
-            padding=ft.padding.only(top=12, bottom=12, left=20, right=20),
+            padding=_BTN_PADDING,
             animation_duration=200,
-            shape=ft.RoundedRectangleBorder(radius=10),
-            elevation={"": 0, "hovered": 3},
+            shape=_ROUNDED_10,
+            elevation=_BTN_ELEVATION,
             shadow_color=ft.colors.with_opacity(0.2, bg_color),
         )
 
     # State variables
-    is_authenticated = False
-    user_role = None
-    sidebar_expanded = False
-    selected_nav_index = 0  # Add this line to track selected navigation item
+    state = AppState()
+
+    # Layout flags derived from page.width; refreshed once per resize event
+    # so handlers and views don't re-read the page width
+    layout_ctx = {}
+
+    def update_layout_ctx():
+        width = page.width
+        layout_ctx["is_desktop"] = width >= 600
+        layout_ctx["field_width"] = 300 if width > 600 else width - 40
+
+    update_layout_ctx()
 
     # Responsive width for text fields
-    field_width = 300 if page.width > 600 else page.width - 40
+    field_width = layout_ctx["field_width"]
+
+    # Form controls whose width follows field_width; resized in page_resize
+    responsive_fields = []
+
+    def responsive(control):
+        responsive_fields.append(control)
+        return control
 
     # Enhanced TextField styling
     def custom_text_field(label, password=False, width=None):
@@ -57,51 +631,53 @@ def main(page: ft.Page):
             password=password,
             width=width,
             border_radius=8,
-            border_color=ft.colors.with_opacity(0.2, ft.colors.WHITE),
+            border_color=_WHITE_20,
             focused_border_color=PRIMARY_COLOR,
             cursor_color=PRIMARY_COLOR,
-            label_style=ft.TextStyle(color=ft.colors.with_opacity(0.7, ft.colors.WHITE)),
-            text_style=ft.TextStyle(color=ft.colors.WHITE, size=16),
-            bgcolor=ft.colors.with_opacity(0.05, ft.colors.WHITE),
+            label_style=_FIELD_LABEL_STYLE,
+            text_style=_FIELD_TEXT_STYLE,
+            bgcolor=_WHITE_05,
         )
 
+    # Each dashboard has its own search field
+    def new_search_field(width=None):
+        return custom_text_field("Search GPUs", width=width)
+
+    # The renter dashboard is shown in both layouts; its search field's
+    # width is adjusted to the layout whenever it is shown
+    renter_search_field = new_search_field(width=300)
+
     # Login Form Fields
-    email_field = custom_text_field("Email", width=field_width)
-    password_field = custom_text_field("Password", password=True, width=field_width)
-    login_button = ft.ElevatedButton(
+    email_field = responsive(custom_text_field("Email", width=field_width))
+    password_field = responsive(custom_text_field("Password", password=True, width=field_width))
+    login_button = responsive(ft.ElevatedButton(
         text="Login",
         width=field_width,
-        style=ft.ButtonStyle(
-            bgcolor=ft.colors.BLUE_800,
-            color=ft.colors.WHITE,
-            padding=15,
-            shape=ft.RoundedRectangleBorder(radius=10),
-        ),
-    )
+        style=_FORM_BUTTON_STYLE,
+    ))
     go_to_register_button = ft.TextButton(
         text="Don't have an account? Register here.",
-        on_click=lambda e: show_registration_form(),
     )
 
     # Registration Form Fields
-    reg_email_field = ft.TextField(
+    reg_email_field = responsive(ft.TextField(
         label="Email",
         width=field_width,
         border_color=ft.colors.GREY_600,
         cursor_color=ft.colors.WHITE,
-        label_style=ft.TextStyle(color=ft.colors.GREY_400),
-        text_style=ft.TextStyle(color=ft.colors.WHITE),
-    )
-    reg_password_field = ft.TextField(
+        label_style=_REG_LABEL_STYLE,
+        text_style=_REG_TEXT_STYLE,
+    ))
+    reg_password_field = responsive(ft.TextField(
         label="Password",
         password=True,
         width=field_width,
         border_color=ft.colors.GREY_600,
         cursor_color=ft.colors.WHITE,
-        label_style=ft.TextStyle(color=ft.colors.GREY_400),
-        text_style=ft.TextStyle(color=ft.colors.WHITE),
-    )
-    reg_role_field = ft.Dropdown(
+        label_style=_REG_LABEL_STYLE,
+        text_style=_REG_TEXT_STYLE,
+    ))
+    reg_role_field = responsive(ft.Dropdown(
         label="Role",
         options=[
             ft.dropdown.Option("Renter"),
@@ -109,505 +685,279 @@ def main(page: ft.Page):
         ],
         width=field_width,
         border_color=ft.colors.GREY_600,
-        label_style=ft.TextStyle(color=ft.colors.GREY_400),
-        text_style=ft.TextStyle(color=ft.colors.WHITE),
-    )
-    register_button = ft.ElevatedButton(
+        label_style=_REG_LABEL_STYLE,
+        text_style=_REG_TEXT_STYLE,
+    ))
+    register_button = responsive(ft.ElevatedButton(
         text="Register",
         width=field_width,
-        style=ft.ButtonStyle(
-            bgcolor=ft.colors.BLUE_800,
-            color=ft.colors.WHITE,
-            padding=15,
-            shape=ft.RoundedRectangleBorder(radius=10),
-        ),
-    )
+        style=_FORM_BUTTON_STYLE,
+    ))
     go_to_login_button = ft.TextButton(
         text="Already have an account? Login here.",
-        on_click=lambda e: show_login_form(),
     )
 
-    # Error Message Display
-    error_message = ft.Text(color=ft.colors.RED, visible=False)
+    # Error Message Display; each form has its own, since a control can only
+    # have one parent
+    login_error = ft.Text(color=ft.colors.RED, visible=False)
+    register_error = ft.Text(color=ft.colors.RED, visible=False)
 
-    # Navigation Items
-    nav_items = [
-        {"icon": ft.icons.DASHBOARD, "label": "Dashboard"},
-        {"icon": ft.icons.MICROWAVE, "label": "My GPUs"},
-        {"icon": ft.icons.DATA_USAGE, "label": "Usage"},
-        {"icon": ft.icons.MONEY, "label": "Income"},
-    ]
+    # Active Instances tables keep a pool of rows; refresh_instances
+    # rewrites the cell values in place and only adds rows when the pool is
+    # too small for the instances
+    def instance_rows(column_count, count=INSTANCE_ROW_POOL):
+        return [
+            ft.DataRow(
+                cells=[ft.DataCell(ft.Text("")) for _ in range(column_count)],
+                visible=False,
+            )
+            for _ in range(count)
+        ]
 
-    # Define the dashboard view function
-    def get_dashboard_view():
-        return ft.Column(
-            [
-                # Header section
-                ft.Container(
-                    ft.Column(
-                        [
-                            ft.Text(
-                                "Active Resources",
-                                size=24,
-                                weight="bold",
-                                color=TEXT_COLOR
-                            ),
-                            ft.Container(
-                                content=custom_text_field(
-                                    "Search GPUs",
-                                    width=None if page.width < 600 else 300
-                                ),
-                                margin=ft.margin.only(top=10, bottom=5),
-                            ),
-                        ],
-                    ),
-                    margin=ft.margin.only(left=16, right=16, top=20, bottom=10),
-                ),
+    instances_table = ft.DataTable(
+        columns=[
+            ft.DataColumn(ft.Text("GPU", size=16)),
+            ft.DataColumn(ft.Text("Task", size=16)),
+            ft.DataColumn(ft.Text("Duration", size=16)),
+            ft.DataColumn(ft.Text("Status", size=16)),
+            ft.DataColumn(ft.Text("Price", size=16), numeric=True),
+        ],
+        rows=instance_rows(5),
+        border_radius=12,
+        heading_row_color=_PRIMARY_10,
+        heading_row_height=56,
+        data_row_min_height=52,
+        data_row_color={"hovered": HOVER_COLOR},
+        column_spacing=40,
+        horizontal_lines=ft.border.BorderSide(1, _WHITE_10),
+    )
 
-                # Cards section
-                ft.Container(
-                    ft.Row(
-                        [
-                            dashboard_card(
-                                ft.icons.MEMORY,
-                                "Active GPUs",
-                                "5/10 GPUs in use",
-                                manageGPU_button,
-                            ),
-                            dashboard_card(
-                                ft.icons.TIMER,
-                                "Usage Time",
-                                "324 hours this month",
-                                usage_time_button,
-                            ),
-                            dashboard_card(
-                                ft.icons.PAYMENTS,
-                                "Current Cost",
-                                "Ksh 15 / hour",
-                                current_cost_button,
-                            ),
-                        ],
-                        scroll=ft.ScrollMode.AUTO,
-                        spacing=16,
-                    ),
-                    padding=16,
-                ),
+    mobile_instances_table = ft.DataTable(
+        columns=[
+            ft.DataColumn(ft.Text("GPU", size=14)),
+            ft.DataColumn(ft.Text("Task", size=14)),
+            ft.DataColumn(ft.Text("Duration", size=14)),
+            ft.DataColumn(ft.Text("Price", size=14)),
+        ],
+        rows=instance_rows(4),
+        border_radius=8,
+        heading_row_color=_PRIMARY_10,
+        heading_row_height=48,
+        data_row_min_height=48,
+        data_row_color={"hovered": HOVER_COLOR},
+        column_spacing=24,
+        horizontal_lines=ft.border.BorderSide(1, _WHITE_10),
+    )
 
-                # Table section
-                ft.Container(
-                    ft.Column(
-                        [
-                            ft.Text(
-                                "Active Instances",
-                                size=24,
-                                color=TEXT_COLOR,
-                                weight="bold"
-                            ),
-                            ft.Container(
-                                content=ft.DataTable(
-                                    columns=[
-                                        ft.DataColumn(ft.Text("GPU", size=16)),
-                                        ft.DataColumn(ft.Text("Task", size=16)),
-                                        ft.DataColumn(ft.Text("Duration", size=16)),
-                                        ft.DataColumn(ft.Text("Status", size=16)),
-                                        ft.DataColumn(ft.Text("Price", size=16), numeric=True),
-                                    ],
-                                    rows=[
-                                        ft.DataRow(
-                                            cells=[
-                                                ft.DataCell(ft.Text("RTX 4090")),
-                                                ft.DataCell(ft.Text("ML Training")),
-                                                ft.DataCell(ft.Text("8h 23m")),
-                                                ft.DataCell(ft.Text("Running")),
-                                                ft.DataCell(ft.Text("Ksh15/h")),
-                                            ],
-                                        ),
-                                        ft.DataRow(
-                                            cells=[
-                                                ft.DataCell(ft.Text("RTX 3080")),
-                                                ft.DataCell(ft.Text("Rendering")),
-                                                ft.DataCell(ft.Text("2h 43m")),
-                                                ft.DataCell(ft.Text("Running")),
-                                                ft.DataCell(ft.Text("Ksh8/h")),
-                                            ],
-                                        ),
-                                    ],
-                                    border_radius=12,
-                                    heading_row_color=ft.colors.with_opacity(0.1, PRIMARY_COLOR),
-                                    heading_row_height=56,
-                                    data_row_min_height=52,
-                                    data_row_color={"hovered": HOVER_COLOR},
-                                    column_spacing=40 if page.width >= 600 else 24,
-                                    horizontal_lines=ft.border.BorderSide(1, ft.colors.with_opacity(0.1, ft.colors.WHITE)),
-                                ),
-                                padding=16,
-                                border_radius=12,
-                                bgcolor=CARD_COLOR,
-                            ),
-                        ],
-                        spacing=16,
-                    ),
-                    margin=ft.margin.only(left=16, right=16),
-                    padding=ft.padding.only(top=16, bottom=16),
-                ),
-            ],
-            scroll=ft.ScrollMode.HIDDEN,
-            expand=True,
-        )
+    def fill_instance_rows(table, instances, columns):
+        missing = len(instances) - len(table.rows)
+        if missing > 0:
+            table.rows.extend(instance_rows(len(table.columns), missing))
+        for i, row in enumerate(table.rows):
+            row.visible = i < len(instances)
+            if row.visible:
+                for cell, value in zip(row.cells, columns(instances[i])):
+                    cell.content.value = value
 
-    # Mobile-specific views
-    def mobile_dashboard_view():
-        return ft.Column(
-            [
-                # Mobile Header
-                ft.Container(
-                    ft.Text(
-                        "Dashboard",
-                        size=28,
-                        weight="bold",
-                        color=TEXT_COLOR
-                    ),
-                    margin=ft.margin.only(left=16, top=20, bottom=16),
-                ),
+    # Desktop placeholders for pages that don't have a full view yet
+    gpus_desktop_view = ft.Column([ft.Text("My GPUs Desktop View")])
+    usage_desktop_view = ft.Column([ft.Text("Usage Desktop View")])
+    income_desktop_view = ft.Column([ft.Text("Income Desktop View")])
 
-                # Search bar
-                ft.Container(
-                    content=custom_text_field(
-                        "Search GPUs",
-                        width=None
-                    ),
-                    margin=ft.margin.symmetric(horizontal=16),
-                ),
-
-                # Stats Cards - Vertical layout for mobile
-                ft.Container(
-                    ft.Column(
-                        [
-                            dashboard_card(
-                                ft.icons.MEMORY,
-                                "Active GPUs",
-                                "5/10 GPUs in use",
-                                manageGPU_button,
-                            ),
-                            dashboard_card(
-                                ft.icons.TIMER,
-                                "Usage Time",
-                                "324 hours this month",
-                                usage_time_button,
-                            ),
-                            dashboard_card(
-                                ft.icons.PAYMENTS,
-                                "Current Cost",
-                                "Ksh 15 / hour",
-                                current_cost_button,
-                            ),
-                        ],
-                        spacing=16,
-                    ),
-                    padding=16,
-                ),
+    # View builders indexed by nav index, one list per layout
+    desktop_builders = [
+        lambda: get_dashboard_view(view_ctx),
+        lambda: gpus_desktop_view,
+        lambda: usage_desktop_view,
+        lambda: income_desktop_view,
+    ]
+    mobile_builders = [
+        lambda: mobile_dashboard_view(view_ctx),
+        lambda: mobile_gpus_view(view_ctx),
+        lambda: mobile_usage_view(view_ctx),
+        lambda: mobile_income_view(view_ctx),
+    ]
 
-                # Active Instances Table
-                ft.Container(
-                    ft.Column(
-                        [
-                            ft.Text(
-                                "Active Instances",
-                                size=20,
-                                weight="bold",
-                                color=TEXT_COLOR
-                            ),
-                            ft.Container(
-                                content=ft.DataTable(
-                                    columns=[
-                                        ft.DataColumn(ft.Text("GPU", size=14)),
-                                        ft.DataColumn(ft.Text("Task", size=14)),
-                                        ft.DataColumn(ft.Text("Duration", size=14)),
-                                        ft.DataColumn(ft.Text("Price", size=14)),
-                                    ],
-                                    rows=[
-                                        ft.DataRow(
-                                            cells=[
-                                                ft.DataCell(ft.Text("RTX 4090")),
-                                                ft.DataCell(ft.Text("ML Training")),
-                                                ft.DataCell(ft.Text("8h 23m")),
-                                                ft.DataCell(ft.Text("Ksh15/h")),
-                                            ],
-                                        ),
-                                        ft.DataRow(
-                                            cells=[
-                                                ft.DataCell(ft.Text("RTX 3080")),
-                                                ft.DataCell(ft.Text("Rendering")),
-                                                ft.DataCell(ft.Text("2h 43m")),
-                                                ft.DataCell(ft.Text("Ksh8/h")),
-                                            ],
-                                        ),
-                                    ],
-                                    border_radius=8,
-                                    heading_row_color=ft.colors.with_opacity(0.1, PRIMARY_COLOR),
-                                    heading_row_height=48,
-                                    data_row_min_height=48,
-                                    data_row_color={"hovered": HOVER_COLOR},
-                                    column_spacing=24,
-                                    horizontal_lines=ft.border.BorderSide(1, ft.colors.with_opacity(0.1, ft.colors.WHITE)),
-                                ),
-                                padding=8,
-                                border_radius=8,
-                                bgcolor=CARD_COLOR,
-                            ),
-                        ],
-                        spacing=16,
-                    ),
-                    margin=ft.margin.all(16),
-                ),
-            ],
-            scroll=ft.ScrollMode.HIDDEN,
-            expand=True,
-        )
+    # Controls changed while handling an event are collected and sent in one
+    # update when the handler returns, so a handler that touches several
+    # controls (e.g. navigation moving the sidebar highlight and swapping the
+    # content) reaches the renderer once, without waiting for a timer
+    pending_updates = []
+    # Flet runs handlers on worker threads; the lock keeps them from
+    # interleaving their changes to the shared controls
+    ui_lock = threading.RLock()
 
-    def mobile_gpus_view():
-        return ft.Column(
-            [
-                ft.Container(
-                    ft.Text(
-                        "My GPUs",
-                        size=28,
-                        weight="bold",
-                        color=TEXT_COLOR
-                    ),
-                    margin=ft.margin.only(left=16, top=20, bottom=16),
-                ),
-                ft.Container(
-                    ft.Column(
-                        [
-                            # GPU Card
-                            ft.Card(
-                                content=ft.Container(
-                                    ft.Column(
-                                        [
-                                            ft.Row(
-                                                [
-                                                    ft.Icon(ft.icons.MEMORY, color=PRIMARY_COLOR, size=24),
-                                                    ft.Text("RTX 4090", size=18, weight="bold", color=TEXT_COLOR),
-                                                    ft.Container(
-                                                        ft.Text("Active", size=12),
-                                                        bgcolor=ft.colors.GREEN_700,
-                                                        border_radius=12,
-                                                        padding=8,
-                                                    ),
-                                                ],
-                                                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                                            ),
-                                            ft.Divider(height=16, color=ft.colors.with_opacity(0.1, ft.colors.WHITE)),
-                                            ft.Row(
-                                                [
-                                                    ft.Text("Temperature: 65°C"),
-                                                    ft.Text("Memory: 18GB/24GB"),
-                                                ],
-                                                alignment=ft.MainAxisAlignment.SPACE_BETWEEN,
-                                            ),
-                                        ],
-                                    ),
-                                    padding=16,
-                                ),
-                            ),
-                        ],
-                        spacing=16,
-                    ),
-                    margin=ft.margin.all(16),
-                ),
-            ],
-            scroll=ft.ScrollMode.HIDDEN,
-            expand=True,
-        )
+    def schedule_update(*controls):
+        for control in controls:
+            if control not in pending_updates:
+                pending_updates.append(control)
 
-    def mobile_usage_view():
-        return ft.Column(
-            [
-                ft.Container(
-                    ft.Text(
-                        "Usage Stats",
-                        size=28,
-                        weight="bold",
-                        color=TEXT_COLOR
-                    ),
-                    margin=ft.margin.only(left=16, top=20, bottom=16),
-                ),
-                ft.Container(
-                    ft.Column(
-                        [
-                            # Usage Stats Cards
-                            ft.Card(
-                                content=ft.Container(
-                                    ft.Column(
-                                        [
-                                            ft.Text("Total Usage Time", size=16, color=ft.colors.GREY_400),
-                                            ft.Text("324 hours", size=24, weight="bold", color=TEXT_COLOR),
-                                            ft.ProgressBar(value=0.75, bgcolor=ft.colors.with_opacity(0.1, PRIMARY_COLOR), color=PRIMARY_COLOR),
-                                        ],
-                                    ),
-                                    padding=16,
-                                ),
-                            ),
-                            ft.Card(
-                                content=ft.Container(
-                                    ft.Column(
-                                        [
-                                            ft.Text("Cost Overview", size=16, color=ft.colors.GREY_400),
-                                            ft.Text("Ksh 4,860", size=24, weight="bold", color=TEXT_COLOR),
-                                            ft.Text("This month", size=14, color=ft.colors.GREY_400),
-                                        ],
-                                    ),
-                                    padding=16,
-                                ),
-                            ),
-                        ],
-                        spacing=16,
-                    ),
-                    margin=ft.margin.all(16),
-                ),
-            ],
-            scroll=ft.ScrollMode.HIDDEN,
-            expand=True,
-        )
+    def event_handler(handler):
+        def run(*args):
+            with ui_lock:
+                handler(*args)
+                controls = [control for control in pending_updates if control.page]
+                pending_updates.clear()
+                if controls:
+                    page.update(*controls)
+        return run
 
-    def mobile_income_view():
-        return ft.Column(
-            [
-                ft.Container(
-                    ft.Text(
-                        "Income",
-                        size=28,
-                        weight="bold",
-                        color=TEXT_COLOR
-                    ),
-                    margin=ft.margin.only(left=16, top=20, bottom=16),
-                ),
-                ft.Container(
-                    ft.Column(
-                        [
-                            # Income Overview Card
-                            ft.Card(
-                                content=ft.Container(
-                                    ft.Column(
-                                        [
-                                            ft.Text("Total Earnings", size=16, color=ft.colors.GREY_400),
-                                            ft.Text("Ksh 12,450", size=24, weight="bold", color=TEXT_COLOR),
-                                            ft.Text("Last 30 days", size=14, color=ft.colors.GREY_400),
-                                        ],
-                                    ),
-                                    padding=16,
-                                ),
-                            ),
-                            # Recent Transactions
-                            ft.Card(
-                                content=ft.Container(
-                                    ft.Column(
-                                        [
-                                            ft.Text("Recent Transactions", size=16, weight="bold", color=TEXT_COLOR),
-                                            ft.ListTile(
-                                                leading=ft.Icon(ft.icons.PAYMENT, color=PRIMARY_COLOR),
-                                                title=ft.Text("Payment Received"),
-                                                subtitle=ft.Text("From: User123"),
-                                                trailing=ft.Text("Ksh 1,500"),
-                                            ),
-                                            ft.ListTile(
-                                                leading=ft.Icon(ft.icons.PAYMENT, color=PRIMARY_COLOR),
-                                                title=ft.Text("Payment Received"),
-                                                subtitle=ft.Text("From: User456"),
-                                                trailing=ft.Text("Ksh 2,300"),
-                                            ),
-                                        ],
-                                    ),
-                                    padding=16,
-                                ),
-                            ),
-                        ],
-                        spacing=16,
-                    ),
-                    margin=ft.margin.all(16),
-                ),
-            ],
-            scroll=ft.ScrollMode.HIDDEN,
-            expand=True,
+    # Each view is built on first visit and reused on later navigation
+    view_cache = {}
 
-        )
+    def get_view(index, is_desktop):
+        key = (index, is_desktop)
+        view = view_cache.get(key)
+        if view is None:
+            builders = desktop_builders if is_desktop else mobile_builders
+            view = view_cache[key] = builders[index]()
+        return view
 
-    # Update the navigation handler to use mobile views
-    def on_nav_item_click(e):
-        nonlocal selected_nav_index
-        if hasattr(e, 'control'):
-            selected_nav_index = e.control.data if hasattr(e.control, 'data') else 0
-        else:
-            selected_nav_index = e
+    # Navigate to the view at the given nav index
+    def navigate_to(index):
+        previous_index = state.selected_nav_index
+        state.selected_nav_index = index
 
         # Use different views based on screen size
-        if page.width >= 600:
-            if selected_nav_index == 0:
-                main_content = get_dashboard_view()
-            elif selected_nav_index == 1:
-                main_content = ft.Column([ft.Text("My GPUs Desktop View")])
-            elif selected_nav_index == 2:
-                main_content = ft.Column([ft.Text("Usage Desktop View")])
-            elif selected_nav_index == 3:
-                main_content = ft.Column([ft.Text("Income Desktop View")])
-            page.clean()
-            page.add(ft.Row([side_nav, main_content], expand=True))
+        is_desktop = layout_ctx["is_desktop"]
+        if state.selected_nav_index != previous_index:
+            # Only the two affected sidebar items change colour
+            nav_containers[previous_index].bgcolor = None
+            nav_containers[state.selected_nav_index].bgcolor = HOVER_COLOR
+            if is_desktop:
+                schedule_update(side_nav)
+        show_content(get_view(state.selected_nav_index, is_desktop), is_desktop)
+
+    # Put a screen (login, registration or a dashboard layout) into the root
+    # container; nothing is sent when it is already showing
+    def show_root(view):
+        if root.content is not view:
+            root.content = view
+            if root.page:
+                schedule_update(root)
+
+    # Swap the view inside the persistent layout; the root only changes when
+    # coming from the login or registration screen
+    def show_content(main_content, is_desktop):
+        renter_search_field.width = 300 if is_desktop else None
+        content_host.content = main_content
+        if root.content is app_layout:
+            schedule_update(content_host)
         else:
-            if selected_nav_index == 0:
-                main_content = mobile_dashboard_view()
-            elif selected_nav_index == 1:
-                main_content = mobile_gpus_view()
-            elif selected_nav_index == 2:
-                main_content = mobile_usage_view()
-            elif selected_nav_index == 3:
-                main_content = mobile_income_view()
-            page.clean()
-            page.add(main_content, bottom_nav)
-
-        page.update()
+            show_root(app_layout)
 
+    @event_handler
     def toggle_sidebar(e):
-        nonlocal sidebar_expanded
-        sidebar_expanded = not sidebar_expanded
-        side_nav.width = 250 if sidebar_expanded else 60
-        page.update()
+        state.sidebar_expanded = not state.sidebar_expanded
+        side_nav.width = 250 if state.sidebar_expanded else 60
+        schedule_update(side_nav)
+
+    # Sidebar items carry their nav index in data
+    @event_handler
+    def on_side_nav_click(e):
+        navigate_to(e.control.data)
+
+    # The bottom bar reports the selected index as a string
+    @event_handler
+    def on_bottom_nav_change(e):
+        navigate_to(int(e.data))
 
     # Button click handlers for navigation
+    @event_handler
     def handle_manage_gpu_click(e):
-        on_nav_item_click(1)  # Navigate to My GPUs (index 1)
+        navigate_to(1)  # Navigate to My GPUs (index 1)
 
+    @event_handler
     def handle_usage_click(e):
-        on_nav_item_click(2)  # Navigate to Usage (index 2)
+        navigate_to(2)  # Navigate to Usage (index 2)
 
+    @event_handler
     def handle_cost_click(e):
-        on_nav_item_click(3)  # Navigate to Income (index 3)
-
-    # Update the buttons with click handlers
-    manageGPU_button = ft.ElevatedButton(
-        text="Manage GPUs",
-        style=custom_button_style(),
-        icon=ft.icons.SETTINGS,
-        icon_color="white",
-        on_click=handle_manage_gpu_click,  # Add click handler
-    )
+        navigate_to(3)  # Navigate to Income (index 3)
 
-    usage_time_button = ft.ElevatedButton(
-        text="View Details",
-        style=custom_button_style(),
-        icon=ft.icons.ANALYTICS,
-        icon_color="white",
-        on_click=handle_usage_click,  # Add click handler
-    )
+    # Dashboard cards with their buttons. Every dashboard view gets its own
+    # set: a control can only have one parent, so the cards can't be shared
+    # between views. They are not cached at module level either: they hold
+    # this session's buttons, and a control can only belong to one page
+    def new_dashboard_cards():
+        return [
+            dashboard_card(
+                ft.icons.MEMORY,
+                "Active GPUs",
+                "5/10 GPUs in use",
+                ft.ElevatedButton(
+                    text="Manage GPUs",
+                    style=custom_button_style(),
+                    icon=ft.icons.SETTINGS,
+                    icon_color="white",
+                    on_click=handle_manage_gpu_click,
+                ),
+            ),
+            dashboard_card(
+                ft.icons.TIMER,
+                "Usage Time",
+                "324 hours this month",
+                ft.ElevatedButton(
+                    text="View Details",
+                    style=custom_button_style(),
+                    icon=ft.icons.ANALYTICS,
+                    icon_color="white",
+                    on_click=handle_usage_click,
+                ),
+            ),
+            dashboard_card(
+                ft.icons.PAYMENTS,
+                "Current Cost",
+                "Ksh 15 / hour",
+                ft.ElevatedButton(
+                    text="Billing Info",
+                    style=custom_button_style(),
+                    icon=ft.icons.PAYMENT,
+                    icon_color="white",
+                    on_click=handle_cost_click,
+                ),
+            ),
+        ]
 
-    current_cost_button = ft.ElevatedButton(
-        text="Billing Info",
-        style=custom_button_style(),
-        icon=ft.icons.PAYMENT,
-        icon_color="white",
-        on_click=handle_cost_click,  # Add click handler
+    # Controls and factories handed to the module-level view builders
+    view_ctx = ViewCtx(
+        instances_table=instances_table,
+        mobile_instances_table=mobile_instances_table,
+        new_search_field=new_search_field,
+        new_dashboard_cards=new_dashboard_cards,
     )
 
+    # Sidebar items are kept so the highlight can move without a rebuild
+    nav_containers = []
+    for i, item in enumerate(nav_items):
+        nav_containers.append(
+            ft.Container(
+                content=ft.Row(
+                    [
+                        ft.Icon(
+                            item.icon,
+                            color=PRIMARY_COLOR,
+                            size=24,
+                        ),
+                        ft.Text(
+                            item.label,
+                            color=TEXT_COLOR,
+                            weight="w500",
+                            size=16,
+                            visible=True,  # Always show labels
+                        ),
+                    ],
+                    spacing=15,
+                ),
+                padding=15,
+                border_radius=8,
+                ink=True,  # Add ripple effect
+                on_click=on_side_nav_click,
+                data=i,
+                bgcolor=HOVER_COLOR if i == state.selected_nav_index else None,
+            )
+        )
+
     side_nav = ft.Container(
         content=ft.Column(
             controls=[
@@ -625,41 +975,14 @@ def main(page: ft.Page):
                                 color=PRIMARY_COLOR,
                                 weight="bold",
                                 size=20,
-                                visible=sidebar_expanded,
+                                visible=state.sidebar_expanded,
                             ),
                         ],
                         alignment=ft.MainAxisAlignment.START,
                     ),
                     padding=ft.padding.only(bottom=20),
                 ),
-                *[
-                    ft.Container(
-                        content=ft.Row(
-                            [
-                                ft.Icon(
-                                    item["icon"],
-                                    color=PRIMARY_COLOR,
-                                    size=24,
-                                ),
-                                ft.Text(
-                                    item["label"],
-                                    color=TEXT_COLOR,
-                                    weight="w500",
-                                    size=16,
-                                    visible=True,  # Always show labels
-                                ),
-                            ],
-                            spacing=15,
-                        ),
-                        padding=15,
-                        border_radius=8,
-                        ink=True,  # Add ripple effect
-                        on_click=on_nav_item_click,
-                        data=i,
-                        bgcolor=HOVER_COLOR if i == selected_nav_index else None,
-                    )
-                    for i, item in enumerate(nav_items)
-                ],
+                *nav_containers,
             ],
             spacing=5,
         ),
@@ -667,97 +990,94 @@ def main(page: ft.Page):
         bgcolor=CARD_COLOR,
         border_radius=15,
         width=250,  # Always expanded
-        animate=ft.animation.Animation(300, "easeOut"),
+        animate=_NAV_ANIM,
         shadow=ft.BoxShadow(
             spread_radius=1,
             blur_radius=15,
-            color=ft.colors.with_opacity(0.2, ft.colors.BLACK),
+            color=_BLACK_20,
             offset=ft.Offset(2, 2),
         ),
-        visible=page.width > 600,
+        visible=layout_ctx["is_desktop"],
     )
 
     # Bottom Navigation Bar for Mobile
     bottom_nav = ft.NavigationBar(
         destinations=[
             ft.NavigationBarDestination(
-                icon=item["icon"],
-                label=item["label"],
+                icon=item.icon,
+                label=item.label,
             )
             for item in nav_items
         ],
-        selected_index=selected_nav_index,
-        on_change=lambda e: on_nav_item_click(e),
+        selected_index=state.selected_nav_index,
+        on_change=on_bottom_nav_change,
         bgcolor=CARD_COLOR,
         height=65,
         surface_tint_color=PRIMARY_COLOR,
-        indicator_color=ft.colors.with_opacity(0.1, PRIMARY_COLOR),
+        indicator_color=_PRIMARY_10,
         label_behavior=ft.NavigationBarLabelBehavior.ALWAYS_SHOW,
-        visible=page.width < 600,  # Visible only on mobile
+        visible=not layout_ctx["is_desktop"],  # Visible only on mobile
     )
 
-    # Enhanced dashboard card styling
-    def dashboard_card(icon, title, subtitle, button):
-        return ft.Container(
-            content=ft.Column(
-                controls=[
-                    ft.Container(
-                        content=ft.Icon(icon, size=32, color=PRIMARY_COLOR),
-                        bgcolor=ft.colors.with_opacity(0.1, PRIMARY_COLOR),
-                        padding=15,
-                        border_radius=12,
-                        animate=ft.animation.Animation(300, "easeOut"),
-                        ink=True,  # Add ripple effect
-                    ),
-                    ft.Text(
-                        title,
-                        color=TEXT_COLOR,
-                        size=20,
-                        weight="bold",
-                        text_align=ft.TextAlign.CENTER,
-                    ),
-                    ft.Text(
-                        subtitle,
-                        color=ft.colors.with_opacity(0.8, ft.colors.WHITE),
-                        size=14,
-                        text_align=ft.TextAlign.CENTER,
-                    ),
-                    ft.Container(
-                        content=button,
-                        animate=ft.animation.Animation(200, "easeOut"),
-                        margin=ft.margin.only(top=10),
-                    ),
-                ],
-                alignment=ft.MainAxisAlignment.CENTER,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=15,
-            ),
-            padding=25,
-            bgcolor=CARD_COLOR,
-            border_radius=15,
-            width=300,  # Slightly wider
-            height=260,  # Slightly taller
-            shadow=ft.BoxShadow(
-                spread_radius=0,
-                blur_radius=15,
-                color=ft.colors.with_opacity(0.15, ft.colors.BLACK),
-                offset=ft.Offset(2, 2),
-            ),
-            animate=ft.animation.Animation(300, "easeOut"),
-            gradient=ft.LinearGradient(
-                begin=ft.alignment.top_left,
-                end=ft.alignment.bottom_right,
-                colors=[
-                    ft.colors.with_opacity(0.05, PRIMARY_COLOR),
-                    "transparent",
-                ],
-            ),
+    # The page holds a single root container whose content is swapped
+    # between screens instead of clearing and re-adding the page
+    root = ft.Container(expand=True)
+
+    # A single layout holds both navigation bars and is built once. Crossing
+    # the desktop/mobile breakpoint only toggles which bar is visible, so no
+    # control ever moves to another parent; navigation only replaces
+    # content_host.content
+    content_host = ft.Container(expand=True)
+    app_layout = ft.Row(
+        [side_nav, ft.Column([content_host, bottom_nav], expand=True)],
+        expand=True,
+    )
+
+    # Renter Active Instances list: a header row plus a ListView that only
+    # builds rows for the visible window and extends it while scrolling
+    instances_header = instance_list_row(INSTANCE_HEADER, header=True)
+    instances_list = ft.ListView(item_extent=ESTIMATE_ROW_HEIGHT)
+
+    def extend_instances_list():
+        start = len(instances_list.controls)
+        instances_list.controls.extend(
+            instance_list_row(instance)
+            for instance in state.instances[start:start + VISIBLE_INSTANCE_ROWS + OVERSCAN]
         )
 
+    @event_handler
+    def on_instances_scroll(e):
+        # Build the next window once the viewport is within OVERSCAN rows of
+        # the last built row
+        remaining = e.max_scroll_extent - e.pixels
+        if remaining < ESTIMATE_ROW_HEIGHT * OVERSCAN and len(instances_list.controls) < len(state.instances):
+            extend_instances_list()
+            schedule_update(instances_list)
+
+    instances_list.on_scroll = on_instances_scroll
+
+    # Show a new set of instances in both tables and the renter list; the
+    # list drops its built window and starts over from the first row
+    def refresh_instances(instances):
+        state.instances = instances
+        fill_instance_rows(instances_table, instances, _INSTANCE_COLUMNS)
+        fill_instance_rows(mobile_instances_table, instances, _MOBILE_INSTANCE_COLUMNS)
+        instances_list.controls.clear()
+        instances_list.height = ESTIMATE_ROW_HEIGHT * min(len(instances), VISIBLE_INSTANCE_ROWS)
+        extend_instances_list()
+        # Controls that aren't shown yet are sent with their view instead
+        schedule_update(*(
+            control for control in (instances_table, mobile_instances_table, instances_list)
+            if control.page
+        ))
+
+    refresh_instances(active_instances)
+
     # RENTER DASHBOARD VIEW
     renter_dashboard = ft.Column(
         [
-            # Header section
+            # Header section; the search field's spacing is folded into the
+            # column spacing and the outer padding instead of its own wrapper
             ft.Container(
                 ft.Column(
                     [
@@ -767,41 +1087,17 @@ def main(page: ft.Page):
                             weight="bold",
                             color=TEXT_COLOR
                         ),
-                        ft.Container(
-                            content=custom_text_field(
-                                "Search GPUs",
-                                width=None if page.width < 600 else 300
-                            ),
-                            margin=ft.margin.only(top=10, bottom=5),
-                        ),
+                        renter_search_field,
                     ],
+                    spacing=20,
                 ),
-                margin=ft.margin.only(left=16, right=16, top=20, bottom=10),  # Consistent 16pt margins
+                padding=ft.padding.only(left=16, right=16, top=20, bottom=15),  # Consistent 16pt margins
             ),
 
             # Cards section with horizontal scroll on mobile
             ft.Container(
-                ft.Row(  # Changed from Column to Row for horizontal layout
-                    [
-                        dashboard_card(
-                            ft.icons.MEMORY,
-                            "Active GPUs",
-                            "5/10 GPUs in use",
-                            manageGPU_button,
-                        ),
-                        dashboard_card(
-                            ft.icons.TIMER,
-                            "Usage Time",
-                            "324 hours this month",
-                            usage_time_button,
-                        ),
-                        dashboard_card(
-                            ft.icons.PAYMENTS,
-                            "Current Cost",
-                            "Ksh 15 / hour",
-                            current_cost_button,
-                        ),
-                    ],
+                ft.Row(
+                    new_dashboard_cards(),
                     scroll=ft.ScrollMode.AUTO,  # Enable horizontal scrolling
                     spacing=16,
                 ),
@@ -819,42 +1115,7 @@ def main(page: ft.Page):
                             weight="bold"
                         ),
                         ft.Container(
-                            content=ft.DataTable(
-                                columns=[
-                                    ft.DataColumn(ft.Text("GPU", size=16)),
-                                    ft.DataColumn(ft.Text("Task", size=16)),
-                                    ft.DataColumn(ft.Text("Duration", size=16)),
-                                    ft.DataColumn(ft.Text("Status", size=16)),
-                                    ft.DataColumn(ft.Text("Price", size=16), numeric=True),
-                                ],
-                                rows=[
-                                    ft.DataRow(
-                                        cells=[
-                                            ft.DataCell(ft.Text("RTX 4090")),
-                                            ft.DataCell(ft.Text("ML Training")),
-                                            ft.DataCell(ft.Text("8h 23m")),
-                                            ft.DataCell(ft.Text("Running")),
-                                            ft.DataCell(ft.Text("Ksh15/h")),
-                                        ],
-                                    ),
-                                    ft.DataRow(
-                                        cells=[
-                                            ft.DataCell(ft.Text("RTX 3080")),
-                                            ft.DataCell(ft.Text("Rendering")),
-                                            ft.DataCell(ft.Text("2h 43m")),
-                                            ft.DataCell(ft.Text("Running")),
-                                            ft.DataCell(ft.Text("Ksh8/h")),
-                                        ],
-                                    ),
-                                ],
-                                border_radius=12,
-                                heading_row_color=ft.colors.with_opacity(0.1, PRIMARY_COLOR),
-                                heading_row_height=56,
-                                data_row_min_height=52,
-                                data_row_color={"hovered": HOVER_COLOR},
-                                column_spacing=40 if page.width >= 600 else 24,
-                                horizontal_lines=ft.border.BorderSide(1, ft.colors.with_opacity(0.1, ft.colors.WHITE)),
-                            ),
+                            content=ft.Column([instances_header, instances_list], spacing=0),
                             padding=16,
                             border_radius=12,
                             bgcolor=CARD_COLOR,
@@ -862,54 +1123,51 @@ def main(page: ft.Page):
                     ],
                     spacing=16,
                 ),
-                margin=ft.margin.only(left=16, right=16),
-                padding=ft.padding.only(top=16, bottom=16),
+                padding=16,
             ),
 
-            # Alerts section with improved mobile styling
-            ft.Container(
-                ft.Card(
-                    content=ft.Container(
-                        content=ft.Column(
-                            [
-                                ft.ListTile(
-                                    title=ft.Text(
-                                        "Recent Alerts",
-                                        size=24,
-                                        weight="bold"
-                                    ),
-                                    content_padding=16,
-                                ),
-                                ft.ListTile(
-                                    leading=ft.Icon(
-                                        ft.icons.WARNING,
-                                        color=ft.colors.AMBER,
-                                        size=24
-                                    ),
-                                    title=ft.Text(
-                                        "GPU Temperature Alert",
-                                        weight="w500"
-                                    ),
-                                    subtitle=ft.Text("RTX 4090 running hot"),
-                                    dense=True
-                                ),
-                                ft.ListTile(
-                                    leading=ft.Icon(
-                                        ft.icons.CHECK_CIRCLE,
-                                        color=ft.colors.GREEN,
-                                        size=24
-                                    ),
-                                    title=ft.Text(
-                                        "Task Completed",
-                                        weight="w500"
-                                    ),
-                                    subtitle=ft.Text("ML Training finished"),
-                                ),
-                            ],
-                            spacing=0,
+            # Alerts section with improved mobile styling; the card carries
+            # its own margin and the tiles their own padding
+            ft.Card(
+                content=ft.Column(
+                    [
+                        ft.ListTile(
+                            title=ft.Text(
+                                "Recent Alerts",
+                                size=24,
+                                weight="bold"
+                            ),
+                            content_padding=ft.padding.only(left=32, top=32, right=32, bottom=16),
                         ),
-                        padding=16,
-                    ),
+                        ft.ListTile(
+                            leading=ft.Icon(
+                                ft.icons.WARNING,
+                                color=ft.colors.AMBER,
+                                size=24
+                            ),
+                            title=ft.Text(
+                                "GPU Temperature Alert",
+                                weight="w500"
+                            ),
+                            subtitle=ft.Text("RTX 4090 running hot"),
+                            dense=True,
+                            content_padding=ft.padding.symmetric(horizontal=32),
+                        ),
+                        ft.ListTile(
+                            leading=ft.Icon(
+                                ft.icons.CHECK_CIRCLE,
+                                color=ft.colors.GREEN,
+                                size=24
+                            ),
+                            title=ft.Text(
+                                "Task Completed",
+                                weight="w500"
+                            ),
+                            subtitle=ft.Text("ML Training finished"),
+                            content_padding=ft.padding.only(left=32, right=32, bottom=16),
+                        ),
+                    ],
+                    spacing=0,
                 ),
                 margin=ft.margin.only(left=16, right=16, bottom=80),  # Extra bottom margin for nav bar
             ),
@@ -932,114 +1190,133 @@ def main(page: ft.Page):
     )
 
     # Login Function
+    @event_handler
     def login(e):
-        nonlocal is_authenticated, user_role
-        email = email_field.value
-        password = password_field.value
-        if email in users and users[email]["password"] == password:
-            is_authenticated = True
-            user_role = users[email]["role"]
-            error_message.visible = False
+        email = (email_field.value or "").strip().lower()
+        password = password_field.value or ""
+        record = find_user(email)
+        if record is not None and verify_password(record, password):
+            state.is_authenticated = True
+            state.user_role = record["role"]
+            login_error.visible = False
             update_ui()
         else:
-            error_message.value = "Invalid email or password."
-            error_message.visible = True
-            page.update()
+            login_error.value = "Invalid email or password."
+            login_error.visible = True
+            schedule_update(login_error)
 
     # Registration Function
+    @event_handler
     def register(e):
-        email = reg_email_field.value
+        email = (reg_email_field.value or "").strip().lower()
         password = reg_password_field.value
-        role = reg_role_field.value.lower()  # Convert role to lowercase
+        role = (reg_role_field.value or "").lower()  # Convert role to lowercase
         if email and password and role:
-            if email in users:
-                error_message.value = "Email already registered."
-                error_message.visible = True
+            if not add_user(email, password, role):
+                register_error.value = "Email already registered."
+                register_error.visible = True
             else:
-                users[email] = {"password": password, "role": role}
-                error_message.value = "Registration successful! Please login."
-                error_message.visible = True
+                # The confirmation is shown on the login form
+                login_error.value = "Registration successful! Please login."
+                login_error.visible = True
+                register_error.visible = False
                 show_login_form()  # Switch to login form after registration
         else:
-            error_message.value = "Please fill all fields."
-            error_message.visible = True
-        page.update()
+            register_error.value = "Please fill all fields."
+            register_error.visible = True
+        schedule_update(register_error)
+
+    # Login and registration screens are built once and swapped in the root
+    login_view = ft.Column(
+        [
+            ft.Text("CoreShare", size=36, weight="bold", color=ft.colors.BLUE),
+            ft.Text("Login", size=30, weight="bold", color=ft.colors.WHITE),
+            email_field,
+            password_field,
+            login_button,
+            go_to_register_button,
+            login_error,
+        ],
+        alignment=ft.MainAxisAlignment.CENTER,
+        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        spacing=20,
+    )
+    register_view = ft.Column(
+        [
+            ft.Text("CoreShare", size=36, weight="bold", color=ft.colors.BLUE),
+            ft.Text("Register", size=30, weight="bold", color=ft.colors.WHITE),
+            reg_email_field,
+            reg_password_field,
+            reg_role_field,
+            register_button,
+            go_to_login_button,
+            register_error,
+        ],
+        alignment=ft.MainAxisAlignment.CENTER,
+        horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+        spacing=20,
+    )
 
     # Show Login Form
     def show_login_form():
-        page.clean()
-        page.add(
-            ft.Column(
-                [
-                    ft.Text("CoreShare", size=36, weight="bold", color=ft.colors.BLUE),
-                    ft.Text("Login", size=30, weight="bold", color=ft.colors.WHITE),
-                    email_field,
-                    password_field,
-                    login_button,
-                    go_to_register_button,
-                    error_message,
-                ],
-                alignment=ft.MainAxisAlignment.CENTER,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=20,
-            )
-        )
+        show_root(login_view)
 
     # Show Registration Form
     def show_registration_form():
-        page.clean()
-        page.add(
-            ft.Column(
-                [
-                    ft.Text("CoreShare", size=36, weight="bold", color=ft.colors.BLUE),
-                    ft.Text("Register", size=30, weight="bold", color=ft.colors.WHITE),
-                    reg_email_field,
-                    reg_password_field,
-                    reg_role_field,
-                    register_button,
-                    go_to_login_button,
-                    error_message,
-                ],
-                alignment=ft.MainAxisAlignment.CENTER,
-                horizontal_alignment=ft.CrossAxisAlignment.CENTER,
-                spacing=20,
-            )
-        )
+        show_root(register_view)
 
     # Update UI Based on Authentication State
     def update_ui():
-        if is_authenticated:
-            page.clean()
-            main_content = renter_dashboard if user_role == "renter" else rentee_dashboard
-
-            if page.width >= 600:
-                # Desktop layout
-                page.add(ft.Row([side_nav, main_content], expand=True))
+        if state.is_authenticated:
+            # The dashboards are built once; only their parent layout changes
+            is_desktop = layout_ctx["is_desktop"]
+            if state.user_role != "renter":
+                main_content = rentee_dashboard
+            elif state.selected_nav_index == 0:
+                main_content = renter_dashboard
             else:
-                # Mobile layout
-                page.add(
-                    main_content,
-                    bottom_nav
-                )
+                main_content = get_view(state.selected_nav_index, is_desktop)
+            show_content(main_content, is_desktop)
         else:
-            show_login_form(),
+            show_login_form()
 
+    @event_handler
+    def go_to_register(e):
+        show_registration_form()
 
+    @event_handler
+    def go_to_login(e):
+        show_login_form()
 
     # Bind Buttons to Functions
     login_button.on_click = login
     register_button.on_click = register
+    go_to_register_button.on_click = go_to_register
+    go_to_login_button.on_click = go_to_login
 
-    # Add window resize handler
+    # Add window resize handler; it runs under the UI lock like the other
+    # handlers and sends nothing unless the field width or the layout changed
+    @event_handler
     def page_resize(e):
-        side_nav.visible = page.width >= 600
-        bottom_nav.visible = page.width < 600
-        update_ui()  # Refresh the layout when resizing
+        was_desktop = layout_ctx["is_desktop"]
+        previous_field_width = layout_ctx["field_width"]
+        update_layout_ctx()
+        if layout_ctx["field_width"] != previous_field_width:
+            for control in responsive_fields:
+                control.width = layout_ctx["field_width"]
+            schedule_update(*responsive_fields)
+        # Only crossing the desktop/mobile breakpoint changes the layout
+        if layout_ctx["is_desktop"] != was_desktop:
+            side_nav.visible = layout_ctx["is_desktop"]
+            bottom_nav.visible = not layout_ctx["is_desktop"]
+            schedule_update(side_nav, bottom_nav)
+            update_ui()
 
     page.on_resize = page_resize
 
     # Initial UI Setup
     update_ui()
+    page.add(root)
 
 
 # Run the App
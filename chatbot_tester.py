@@ -9,11 +9,24 @@ import os
 import sys
 import json
 import importlib.util
+import inspect
 import logging
+import mmap
+import re
+import signal
+import threading
 import traceback
 import time
 import argparse
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from repo_scan import SKIP_DIRS, SCAN_WORKERS, list_tracked_files
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
 
 # Configure logging
 logging.basicConfig(
@@ -25,7 +38,122 @@ logger = logging.getLogger('ChatbotTester')
 
 REPO_DIR = "CoreShare"
 
-def load_module_from_path(module_name, file_path):
+# Candidate file names that might contain the chatbot implementation,
+# in priority order
+CHATBOT_FILE_PATTERNS = (
+    "cori.py", "chatbot.py", "bot.py", "chat_with_cori.py", "assistant.py",
+    "ai_chat.py", "conversation.py", "dialogue.py", "chat_service.py"
+)
+CHATBOT_FILE_SET = frozenset(CHATBOT_FILE_PATTERNS)
+CHATBOT_NAME_RE = re.compile(r'chat|cori|bot', re.IGNORECASE)
+
+# Common function names for chatbot processing, in priority order
+API_FUNCTION_CANDIDATES = (
+    "chat", "process_message", "get_response", "handle_message", 
+    "generate_response", "answer", "respond", "process_chat",
+    "chat_with_cori", "cori_response", "send_message"
+)
+API_FUNCTION_SET = frozenset(API_FUNCTION_CANDIDATES)
+API_NAME_KEYWORDS = ("chat", "message", "response", "cori")
+
+# Calling patterns tried against a chatbot function
+CALL_PATTERNS = (
+    # Pattern 1: Just the message
+    lambda func, message: func(message),
+    # Pattern 2: Dict with 'message' key
+    lambda func, message: func({"message": message}),
+    # Pattern 3: Message and user ID
+    lambda func, message: func(message, "test_user"),
+    # Pattern 4: Dict with message and user
+    lambda func, message: func({"message": message, "user_id": "test_user"}),
+    # Pattern 5: JSON string
+    lambda func, message: func(json.dumps({"message": message})),
+)
+POSITIONAL_KINDS = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+# Parameter names suggesting the function expects a request dict
+DICT_PARAM_NAMES = frozenset(("payload", "data", "request", "body", "params"))
+
+# Flask route decorator followed by the view function it decorates
+FLASK_ROUTE_RE = re.compile(
+    rb'@(?:app|blueprint)\.route\(\s*["\']([^"\']+)["\'][^)]*\)\s*\n\s*def\s+(\w+)\s*\(',
+    re.IGNORECASE
+)
+CHATBOT_KEYWORD_RE = re.compile(rb'chat|cori|bot', re.IGNORECASE)
+ROUTE_KEYWORD_RE = re.compile(rb'chat|message|cori', re.IGNORECASE)
+
+# Only the start of a file is read when looking for chatbot markers
+CONTENT_SCAN_BYTES = 16384
+
+# Default time limit for executing a repository module while loading it
+# (--load-timeout). It is generous because modules importing torch or
+# transformers, or loading a model on import, take a while. A memory cap is
+# opt-in (--memory-limit), since ML libraries reserve a lot of address space
+# just by being imported
+MODULE_LOAD_TIMEOUT = 120  # seconds
+
+class _ModuleLoadTimeout(TimeoutError):
+    """Raised when a module load exceeds its time limit."""
+
+def raise_load_timeout(signum, frame):
+    """SIGALRM handler that aborts a module load."""
+    raise _ModuleLoadTimeout("module load timed out")
+
+def current_address_space():
+    """Return the process's current virtual memory size in bytes, or None if unknown."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def exec_module_with_limits(spec, module, memory_limit=None, timeout=MODULE_LOAD_TIMEOUT):
+    """Execute a module under a time limit and, if given and supported, a memory cap.
+    
+    memory_limit is the address space in bytes the module may add on top of
+    what the process already uses. A timeout of 0 disables the time limit.
+    """
+    if not hasattr(signal, 'SIGALRM') or threading.current_thread() is not threading.main_thread():
+        # No SIGALRM here (e.g. Windows): run the module in a watchdog thread.
+        # This is best effort, as a timed-out thread cannot be stopped.
+        errors = []
+        
+        def run():
+            try:
+                spec.loader.exec_module(module)
+            except BaseException as e:
+                errors.append(e)
+        
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        worker.join(timeout or None)
+        if worker.is_alive():
+            raise _ModuleLoadTimeout("module load timed out")
+        if errors:
+            raise errors[0]
+        return
+    
+    previous_limits = None
+    in_use = current_address_space() if memory_limit and resource is not None else None
+    if in_use is not None:
+        previous_limits = resource.getrlimit(resource.RLIMIT_AS)
+        hard = previous_limits[1]
+        soft = in_use + memory_limit
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+    elif memory_limit:
+        logger.warning("Memory limit is not supported on this platform; loading without it.")
+    previous_handler = signal.signal(signal.SIGALRM, raise_load_timeout)
+    signal.alarm(timeout)  # 0 schedules no alarm
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        signal.alarm(0)
+        signal.signal(signal.SIGALRM, previous_handler)
+        if previous_limits is not None:
+            resource.setrlimit(resource.RLIMIT_AS, previous_limits)
+
+def load_module_from_path(module_name, file_path, memory_limit=None, timeout=MODULE_LOAD_TIMEOUT):
     """Dynamically load a Python module from file path."""
     spec = importlib.util.spec_from_file_location(module_name, file_path)
     if spec is None:
@@ -33,78 +161,124 @@ def load_module_from_path(module_name, file_path):
     
     module = importlib.util.module_from_spec(spec)
     try:
-        spec.loader.exec_module(module)
+        exec_module_with_limits(spec, module, memory_limit, timeout)
         return module
+    except _ModuleLoadTimeout:
+        logger.error(f"Timed out loading module {module_name} from {file_path} after {timeout}s")
+        return None
     except Exception as e:
         logger.error(f"Error loading module {module_name} from {file_path}: {e}")
         logger.error(traceback.format_exc())
         return None
 
+def walk_python_files(root):
+    """Yield paths of Python files under root, skipping vendor and build directories."""
+    # Git's file list is authoritative for a clone; walk the tree otherwise
+    tracked = list_tracked_files(root)
+    if tracked is not None:
+        yield from (file_path for file_path in tracked if file_path.endswith('.py'))
+        return
+    
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.name.endswith('.py'):
+                        yield entry.path
+        except OSError:
+            continue
+
 def find_chatbot_module():
     """Find the main chatbot module in the repository."""
     if not os.path.exists(REPO_DIR):
         logger.error(f"Repository directory {REPO_DIR} not found. Run clone_and_setup.py first.")
         return None
     
-    # Candidate file patterns that might contain the chatbot implementation
-    patterns = [
-        "cori.py", "chatbot.py", "bot.py", "chat_with_cori.py", "assistant.py",
-        "ai_chat.py", "conversation.py", "dialogue.py", "chat_service.py"
-    ]
+    # Walk the tree once: the highest-priority exact match wins, the first
+    # partial match is remembered and all Python files are kept for the content scan
+    exact_match = None
+    exact_rank = len(CHATBOT_FILE_PATTERNS)
+    partial_match = None
+    python_files = []
+    for file_path in walk_python_files(REPO_DIR):
+        file = os.path.basename(file_path)
+        if file in CHATBOT_FILE_SET:
+            rank = CHATBOT_FILE_PATTERNS.index(file)
+            if rank == 0:
+                return file_path
+            if rank < exact_rank:
+                exact_match, exact_rank = file_path, rank
+        elif partial_match is None and CHATBOT_NAME_RE.search(file):
+            partial_match = file_path
+        python_files.append(file_path)
     
-    # Look for exact matches first
-    for root, _, files in os.walk(REPO_DIR):
-        for pattern in patterns:
-            if pattern in files:
-                return os.path.join(root, pattern)
-    
-    # Then check for partial matches
-    for root, _, files in os.walk(REPO_DIR):
-        for file in files:
-            if file.endswith('.py') and any(keyword in file.lower() for keyword in ["chat", "cori", "bot"]):
-                return os.path.join(root, file)
-    
-    # Last resort: check content of Python files
-    for root, _, files in os.walk(REPO_DIR):
-        for file in files:
-            if not file.endswith('.py'):
-                continue
-                
-            file_path = os.path.join(root, file)
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read().lower()
-                    if "chat with cori" in content or "cori chatbot" in content:
-                        return file_path
-            except Exception:
-                pass
+    if exact_match:
+        return exact_match
+    
+    if partial_match:
+        return partial_match
+    
+    # Last resort: check content of Python files. Files are read in parallel
+    # but results are taken in walk order, so the first match is stable
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        for file_path, found in zip(python_files, executor.map(has_chatbot_marker, python_files)):
+            if found:
+                executor.shutdown(cancel_futures=True)
+                return file_path
     
     return None
 
+def has_chatbot_marker(file_path):
+    """Check whether the start of a file mentions the Cori chatbot."""
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(CONTENT_SCAN_BYTES).lower()
+        return b"chat with cori" in head or b"cori chatbot" in head
+    except Exception:
+        return False
+
 def find_api_function(module):
     """Try to find the API function that handles chatbot interactions."""
-    # Common function names for chatbot processing
-    function_candidates = [
-        "chat", "process_message", "get_response", "handle_message", 
-        "generate_response", "answer", "respond", "process_chat",
-        "chat_with_cori", "cori_response", "send_message"
-    ]
+    module_symbols = vars(module)
     
-    for func_name in function_candidates:
-        if hasattr(module, func_name) and callable(getattr(module, func_name)):
-            return getattr(module, func_name)
+    # Exact candidate names, in priority order
+    for func_name in sorted(API_FUNCTION_SET.intersection(module_symbols), key=API_FUNCTION_CANDIDATES.index):
+        if callable(module_symbols[func_name]):
+            return module_symbols[func_name]
     
     # If no exact match, look for any function that might be relevant
-    for attr_name in dir(module):
+    for attr_name, attr in module_symbols.items():
         if attr_name.startswith('_'):
             continue
             
-        attr = getattr(module, attr_name)
-        if callable(attr) and any(keyword in attr_name.lower() for keyword in ["chat", "message", "response", "cori"]):
+        if callable(attr) and any(keyword in attr_name.lower() for keyword in API_NAME_KEYWORDS):
             return attr
     
     return None
 
+def select_call_pattern(func):
+    """Pick the calling pattern index from the function signature, or None if unclear."""
+    try:
+        params = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        # No signature available (e.g. some builtins or C extensions)
+        return None
+    
+    positional = [p for p in params if p.kind in POSITIONAL_KINDS]
+    required = [p for p in positional if p.default is p.empty]
+    if len(positional) == 1:
+        param = positional[0]
+        if param.annotation in (dict, "dict") or param.name.lower() in DICT_PARAM_NAMES:
+            return 3  # Dict with message and user
+        return 0  # Just the message
+    if len(required) == 2:
+        return 2  # Message and user ID
+    return None
+
 def try_chatbot_function(func, test_messages):
     """Try to use the chatbot function with different argument patterns."""
     if not func:
@@ -112,87 +286,87 @@ def try_chatbot_function(func, test_messages):
         
     success = False
     
+    # Try the pattern suggested by the signature first, then the others
+    pattern_order = list(range(len(CALL_PATTERNS)))
+    preferred = select_call_pattern(func)
+    if preferred is not None:
+        pattern_order.remove(preferred)
+        pattern_order.insert(0, preferred)
+    
+    # Skip formatting the per-probe messages (and the response) when INFO is off
+    log_info = logger.isEnabledFor(logging.INFO)
     for message in test_messages:
-        logger.info(f"Testing message: '{message}'")
-        
-        # Try different calling patterns
-        try_patterns = [
-            # Pattern 1: Just the message
-            lambda: func(message),
-            # Pattern 2: Dict with 'message' key
-            lambda: func({"message": message}),
-            # Pattern 3: Message and user ID
-            lambda: func(message, "test_user"),
-            # Pattern 4: Dict with message and user
-            lambda: func({"message": message, "user_id": "test_user"}),
-            # Pattern 5: JSON string
-            lambda: func(json.dumps({"message": message}))
-        ]
+        if log_info:
+            logger.info(f"Testing message: '{message}'")
         
-        for i, pattern in enumerate(try_patterns):
+        last_error = None
+        for i in pattern_order:
             try:
-                logger.info(f"Trying calling pattern {i+1}...")
-                response = pattern()
-                logger.info(f"Got response: {response}")
+                if log_info:
+                    logger.info(f"Trying calling pattern {i+1}...")
+                response = CALL_PATTERNS[i](func, message)
+                if log_info:
+                    logger.info(f"Got response: {response}")
                 success = True
                 break
             except Exception as e:
-                if i == len(try_patterns) - 1:
-                    logger.error(f"Failed with all calling patterns. Last error: {e}")
-                    logger.error(traceback.format_exc())
-                continue
+                # Probing patterns is expected to fail; keep it cheap
+                last_error = e
+                logger.debug("Calling pattern %d failed: %r", i + 1, e)
+        else:
+            logger.error(f"Failed with all calling patterns. Last error: {last_error!r}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("".join(traceback.format_exception(type(last_error), last_error, last_error.__traceback__)))
         
         if success:
             break
     
     return success
 
+def scan_flask_file(file_path):
+    """Return the chatbot endpoints in a Flask file, or None if it is not a chatbot Flask file."""
+    try:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'flask') == -1 or not CHATBOT_KEYWORD_RE.search(mm):
+                return None
+            endpoints = []
+            for match in FLASK_ROUTE_RE.finditer(mm):
+                # Routes are filtered as bytes; only the kept ones are decoded
+                route = match.group(1)
+                if ROUTE_KEYWORD_RE.search(route):
+                    endpoints.append((route.decode('utf-8', errors='ignore'), match.group(2).decode('ascii'), file_path))
+            return endpoints
+    except ValueError:
+        # Empty files cannot be mapped
+        return None
+    except Exception as e:
+        logger.error(f"Error analyzing Flask file {file_path}: {e}")
+        return None
+
 def test_flask_endpoints():
     """Try to find and test Flask endpoints that might handle chatbot functionality."""
     app_files = []
+    chatbot_endpoints = []
     
-    # Find potential Flask app files
-    for root, _, files in os.walk(REPO_DIR):
-        for file in files:
-            if not file.endswith('.py'):
-                continue
-                
-            file_path = os.path.join(root, file)
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read().lower()
-                    if ("from flask import" in content or "import flask" in content) and (
-                            "chat" in content or "cori" in content or "bot" in content):
-                        app_files.append(file_path)
-            except Exception:
-                pass
+    # Map each Python file once, scanning files in parallel: cheap substring
+    # checks pick out Flask files that mention the chatbot, then a single
+    # regex pass extracts the routes
+    python_files = list(walk_python_files(REPO_DIR))
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        for file_path, endpoints in zip(python_files, executor.map(scan_flask_file, python_files)):
+            if endpoints is not None:
+                app_files.append(file_path)
+                chatbot_endpoints.extend(endpoints)
     
     if not app_files:
         logger.warning("No Flask application files found for the chatbot.")
         return False
     
-    # Try to identify chatbot endpoints
-    chatbot_endpoints = []
-    for file_path in app_files:
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.readlines()
-                for i, line in enumerate(content):
-                    line_lower = line.lower()
-                    if ("@app.route" in line_lower or "@blueprint.route" in line_lower) and (
-                            "chat" in line_lower or "message" in line_lower or "cori" in line_lower):
-                        # Extract route and function info
-                        route = line.split("route(")[1].split(")")[0].strip().strip("'").strip('"')
-                        func_line = content[i+1].strip()
-                        func_name = func_line.split("def ")[1].split("(")[0].strip()
-                        chatbot_endpoints.append((route, func_name, file_path))
-        except Exception as e:
-            logger.error(f"Error analyzing Flask file {file_path}: {e}")
-    
     if chatbot_endpoints:
         logger.info(f"Found {len(chatbot_endpoints)} potential chatbot endpoints:")
-        for route, func_name, file_path in chatbot_endpoints:
-            logger.info(f"  - Route: {route}, Function: {func_name}, File: {file_path}")
+        if logger.isEnabledFor(logging.INFO):
+            for route, func_name, file_path in chatbot_endpoints:
+                logger.info(f"  - Route: {route}, Function: {func_name}, File: {file_path}")
         logger.info("To test the Flask endpoints, run the application with run_app.py")
         return True
     else:
@@ -203,6 +377,14 @@ def main():
     """Main function to test the Chat with Cori chatbot."""
     parser = argparse.ArgumentParser(description="Test the Chat with Cori chatbot")
     parser.add_argument("--message", help="Test message to send to the chatbot")
+    parser.add_argument(
+        "--memory-limit", type=int, metavar="MB",
+        help="Cap the memory the chatbot module may allocate while loading (off by default)"
+    )
+    parser.add_argument(
+        "--load-timeout", type=int, default=MODULE_LOAD_TIMEOUT, metavar="SECONDS",
+        help=f"Give up loading the chatbot module after this long; 0 disables (default: {MODULE_LOAD_TIMEOUT})"
+    )
     args = parser.parse_args()
     
     test_messages = [
@@ -230,7 +412,8 @@ def main():
     logger.info(f"Found potential chatbot module: {chatbot_module_path}")
     
     module_name = os.path.basename(chatbot_module_path).split('.')[0]
-    module = load_module_from_path(module_name, chatbot_module_path)
+    memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit else None
+    module = load_module_from_path(module_name, chatbot_module_path, memory_limit, args.load_timeout)
     
     if not module:
         logger.error("Failed to load the chatbot module.")
@@ -10,6 +10,19 @@ import sys
 import subprocess
 import shutil
 import logging
+import mmap
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from repo_scan import (
+    SKIP_DIRS, SCAN_WORKERS, list_tracked_files,
+    scan_cache_version, load_scan_cache, save_scan_cache
+)
+
+try:
+    import ahocorasick
+except ImportError:  # Optional; file names are matched with a regex instead
+    ahocorasick = None
 
 # Configure logging
 logging.basicConfig(
@@ -22,6 +35,44 @@ logger = logging.getLogger('CoreShareSetup')
 REPO_URL = "https://github.com/FredrickOdondi/CoreShare.git"
 REPO_DIR = "CoreShare"
 
+# Extensions of binary files that are never scanned for chatbot code
+BINARY_EXTENSIONS = frozenset((
+    "png", "jpg", "jpeg", "gif", "svg", "ico",
+    "mp3", "wav", "mp4", "woff", "ttf"
+))
+
+# Name fragments that suggest a file is related to the chatbot
+CHATBOT_PATTERNS = (
+    "cori", "chat", "bot", "dialog", "conversation", "ai", "nlp", 
+    "openai", "gpt", "huggingface", "cohere", "azure"
+)
+CHATBOT_PATTERN_RE = re.compile("|".join(CHATBOT_PATTERNS), re.IGNORECASE)
+# With pyahocorasick installed, all patterns are matched in one automaton pass
+CHATBOT_PATTERN_AUTOMATON = None
+if ahocorasick is not None:
+    CHATBOT_PATTERN_AUTOMATON = ahocorasick.Automaton()
+    for pattern in CHATBOT_PATTERNS:
+        CHATBOT_PATTERN_AUTOMATON.add_word(pattern, pattern)
+    CHATBOT_PATTERN_AUTOMATON.make_automaton()
+# Content markers. "bot" is itself one of the patterns, so "pattern and bot"
+# reduces to "bot", which also covers "cori chatbot".
+CHATBOT_NEEDLE_RE = re.compile(rb"chat with cori|bot", re.IGNORECASE)
+# Cached results are only reused while both patterns are unchanged
+CHATBOT_SCAN_VERSION = scan_cache_version(CHATBOT_PATTERN_RE, CHATBOT_NEEDLE_RE)
+
+# Install commands per package manager, run with REPO_DIR as working directory
+INSTALL_COMMANDS = {
+    "pip": [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
+    "npm": ["npm", "install"],
+}
+INSTALL_SUCCESS_MESSAGES = {
+    "pip": "Python dependencies installed successfully.",
+    "npm": "Node.js dependencies installed successfully.",
+}
+
+# Threads unlinking files when an old clone is removed
+RMTREE_WORKERS = 8
+
 def check_git_installed():
     """Check if Git is installed on the system."""
     try:
@@ -31,6 +82,37 @@ def check_git_installed():
         logger.error("Git is not installed. Please install Git and try again.")
         return False
 
+def fast_rmtree(path):
+    """Remove a directory tree, unlinking its files on a thread pool."""
+    # Like shutil.rmtree, never follow a link to delete the tree it points to
+    if os.path.islink(path):
+        raise OSError(f"Cannot remove {path}: it is a symbolic link")
+    
+    if os.name == 'nt':
+        # Windows needs shutil's handling of read-only files
+        shutil.rmtree(path)
+        return
+    
+    files = []
+    directories = []
+    stack = [path]
+    while stack:
+        directory = stack.pop()
+        directories.append(directory)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+    
+    with ThreadPoolExecutor(max_workers=RMTREE_WORKERS) as executor:
+        list(executor.map(os.unlink, files))
+    
+    # Each directory was listed before its subdirectories, so remove them in reverse
+    for directory in reversed(directories):
+        os.rmdir(directory)
+
 def clone_repository():
     """Clone the CoreShare repository."""
     logger.info(f"Cloning repository from {REPO_URL}...")
@@ -39,16 +121,21 @@ def clone_repository():
         logger.warning(f"Directory {REPO_DIR} already exists.")
         response = input(f"Do you want to remove the existing {REPO_DIR} directory and clone again? (y/n): ")
         if response.lower() == 'y':
-            shutil.rmtree(REPO_DIR)
+            try:
+                fast_rmtree(REPO_DIR)
+            except OSError as e:
+                logger.error(f"Failed to remove {REPO_DIR}: {e}")
+                return False
         else:
             logger.info("Using existing repository directory.")
             return True
     
     try:
+        # Only the working tree is inspected, so fetch just the latest commit
+        # of the default branch
         result = subprocess.run(
-            ["git", "clone", REPO_URL, REPO_DIR],
+            ["git", "clone", "--depth=1", "--single-branch", REPO_URL, REPO_DIR],
             check=True,
-            stdout=subprocess.PIPE,
             stderr=subprocess.PIPE
         )
         logger.info("Repository cloned successfully.")
@@ -72,39 +159,36 @@ def detect_package_managers():
     
     return package_managers
 
+def run_installer(pm):
+    """Run one package manager's install command, capturing its output."""
+    return subprocess.run(
+        INSTALL_COMMANDS[pm],
+        cwd=REPO_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+
 def install_dependencies(package_managers):
     """Install dependencies based on detected package managers."""
-    os.chdir(REPO_DIR)
-    
     for pm in package_managers:
         logger.info(f"Installing dependencies using {pm}...")
-        
+    
+    # The installers work on disjoint trees and mostly wait on the network,
+    # so they run side by side; each thread drains its own process's pipes
+    with ThreadPoolExecutor(max_workers=max(1, len(package_managers))) as executor:
+        results = list(executor.map(run_installer, package_managers))
+    
+    success = True
+    for pm, result in zip(package_managers, results):
         try:
-            if pm == "pip":
-                subprocess.run(
-                    [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                logger.info("Python dependencies installed successfully.")
-            
-            elif pm == "npm":
-                subprocess.run(
-                    ["npm", "install"],
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                logger.info("Node.js dependencies installed successfully.")
-        
+            result.check_returncode()
+            logger.info(INSTALL_SUCCESS_MESSAGES[pm])
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to install dependencies with {pm}: {e}")
             logger.error(f"Error details: {e.stderr.decode()}")
-            return False
+            success = False
     
-    os.chdir("..")
-    return True
+    return success
 
 def check_for_api_keys():
     """Check for required API keys in environment variables."""
@@ -128,43 +212,80 @@ def check_for_api_keys():
     else:
         logger.info("All common API keys are available in environment variables.")
 
+def scan_files(path):
+    """Recursively yield DirEntry objects for non-hidden files under path."""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            # Symlinks are skipped so links can't create cycles
+            if entry.name.startswith(".") or entry.is_symlink():
+                continue
+            if entry.is_dir():
+                if entry.name not in SKIP_DIRS:
+                    yield from scan_files(entry.path)
+            elif entry.is_file():
+                yield entry
+
+def name_has_chatbot_pattern(name):
+    """Check whether a file name contains any of the chatbot patterns."""
+    if CHATBOT_PATTERN_AUTOMATON is not None:
+        return next(CHATBOT_PATTERN_AUTOMATON.iter(name.lower()), None) is not None
+    return CHATBOT_PATTERN_RE.search(name) is not None
+
+def is_chatbot_file(path):
+    """Check whether a file's name or content suggests it belongs to the chatbot."""
+    # Check if file name contains any of the patterns
+    if name_has_chatbot_pattern(os.path.basename(path)):
+        return True
+    
+    # Check file content for chatbot-related keywords
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return CHATBOT_NEEDLE_RE.search(mm) is not None
+    except Exception:
+        # Skip files that can't be mapped (e.g. empty files)
+        return False
+
 def find_chatbot_files():
     """Find files related to the chatbot functionality."""
-    chatbot_related_files = []
+    # Git's file list is authoritative for a clone; walk the tree otherwise
+    paths = list_tracked_files(REPO_DIR, skip_hidden=True)
+    if paths is None:
+        paths = [entry.path for entry in scan_files(REPO_DIR)]
     
-    patterns = [
-        "cori", "chat", "bot", "dialog", "conversation", "ai", "nlp", 
-        "openai", "gpt", "huggingface", "cohere", "azure"
-    ]
+    # Skip binary files. Every listed path starts with REPO_DIR, so slicing it
+    # off is enough; os.path.relpath would resolve both paths against the cwd
+    prefix_len = len(os.path.join(REPO_DIR, ""))
+    files = []
+    keys = []
+    for path in paths:
+        if os.path.splitext(path)[1][1:].lower() in BINARY_EXTENSIONS:
+            continue
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            # Tracked but deleted from the working tree
+            continue
+        files.append(path)
+        keys.append((path[prefix_len:], mtime))
     
-    for root, dirs, files in os.walk(REPO_DIR):
-        for file in files:
-            # Skip binary files and hidden files
-            if file.startswith(".") or any(file.endswith(ext) for ext in [
-                ".png", ".jpg", ".jpeg", ".gif", ".svg", ".ico", 
-                ".mp3", ".wav", ".mp4", ".woff", ".ttf"
-            ]):
-                continue
-                
-            file_path = os.path.join(root, file)
-            file_lower = file.lower()
-            
-            # Check if file name contains any of the patterns
-            if any(pattern in file_lower for pattern in patterns):
-                chatbot_related_files.append(file_path)
-            else:
-                # Check file content for chatbot-related keywords
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read().lower()
-                        if any(f"chat with cori" in content or 
-                               f"cori chatbot" in content or
-                               (pattern in content and "bot" in content) 
-                               for pattern in patterns):
-                            chatbot_related_files.append(file_path)
-                except Exception:
-                    # Skip files that can't be read as text
-                    pass
+    # Only files that are new or changed since the last run are read again
+    cached = load_scan_cache(REPO_DIR, "chatbot-files", CHATBOT_SCAN_VERSION)
+    stale = [path for path, (rel_path, mtime) in zip(files, keys) if cached.get(rel_path, [None])[0] != mtime]
+    
+    # Files are checked in parallel
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        scanned = dict(zip(stale, executor.map(is_chatbot_file, stale)))
+    
+    chatbot_related_files = []
+    results = {}
+    for path, (rel_path, mtime) in zip(files, keys):
+        related = scanned[path] if path in scanned else cached[rel_path][1]
+        results[rel_path] = [mtime, related]
+        if related:
+            chatbot_related_files.append(path)
+    
+    if results != cached:
+        save_scan_cache(REPO_DIR, "chatbot-files", CHATBOT_SCAN_VERSION, results)
     
     if chatbot_related_files:
         logger.info(f"Found {len(chatbot_related_files)} files potentially related to the chatbot:")
@@ -0,0 +1,100 @@
+"""
+CoreShare Repository Scan Helpers
+Shared by clone_and_setup.py, run_app.py and chatbot_tester.py to list the files
+in the cloned repository and to cache per-file scan results between runs.
+"""
+
+import os
+import json
+import hashlib
+import subprocess
+import logging
+
+logger = logging.getLogger('CoreShareScan')
+
+# Version control, virtualenv, dependency and build directories are never
+# relevant to the scans and often hold most of the files
+SKIP_DIRS = frozenset((
+    ".git", "node_modules", "venv", ".venv", "__pycache__",
+    ".mypy_cache", ".pytest_cache", "dist", "build", ".next"
+))
+
+# File scans are I/O bound, so use more threads than cores
+SCAN_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Per-file scan results from earlier runs, keyed by path relative to the
+# repository root and invalidated by the file's mtime. Each scan has its own
+# file, so scripts never overwrite each other's results, and a version that
+# fingerprints the scan's patterns, so changing them discards old results.
+# The files are kept inside .git so they never show up as untracked files.
+SCAN_CACHE_NAME = "coreshare-{}-cache"
+# Bump when the layout of the cached entries changes
+SCAN_CACHE_FORMAT = 3
+
+def list_tracked_files(root, skip_hidden=False):
+    """List the files tracked at HEAD under root, or None if git can't list them."""
+    if not os.path.isdir(os.path.join(root, ".git")):
+        return None
+    try:
+        # One read of the tree objects instead of a walk that stats every file
+        result = subprocess.run(
+            ["git", "-C", root, "ls-tree", "-r", "-z", "HEAD"],
+            check=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    except (subprocess.SubprocessError, FileNotFoundError):
+        return None
+    
+    # Git always separates path components with "/"; plain concatenation onto
+    # the root is cheaper than os.path.join per file
+    prefix = os.path.join(root, "")
+    files = []
+    for record in os.fsdecode(result.stdout).split("\0"):
+        mode, _, path = record.partition("\t")
+        # Symlinks (120000) and submodules (160000) are skipped, as in the walks
+        if not path or mode.startswith(("120000", "160000")):
+            continue
+        parts = path.split("/")
+        if not SKIP_DIRS.isdisjoint(parts[:-1]):
+            continue
+        if skip_hidden and any(part.startswith(".") for part in parts):
+            continue
+        files.append(prefix + (path if os.sep == "/" else path.replace("/", os.sep)))
+    return files
+
+def scan_cache_version(*patterns):
+    """Fingerprint the compiled regexes a scan classifies files with."""
+    digest = hashlib.sha1(str(SCAN_CACHE_FORMAT).encode())
+    for pattern in patterns:
+        digest.update(repr((pattern.pattern, pattern.flags)).encode())
+    return digest.hexdigest()
+
+def scan_cache_path(root, name):
+    """Return where a scan's cache is kept: in .git if root is a checkout, else hidden in root."""
+    git_dir = os.path.join(root, ".git")
+    if os.path.isdir(git_dir):
+        return os.path.join(git_dir, SCAN_CACHE_NAME.format(name))
+    return os.path.join(root, "." + SCAN_CACHE_NAME.format(name))
+
+def load_scan_cache(root, name, version):
+    """Load the cached results of a scan, or none if missing, unreadable or from another version."""
+    try:
+        with open(scan_cache_path(root, name), 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != version or not isinstance(cache.get("files"), dict):
+        return {}
+    return cache["files"]
+
+def save_scan_cache(root, name, version, files):
+    """Write the results of a scan atomically so a crash never leaves them half-written."""
+    cache_path = scan_cache_path(root, name)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": version, "files": files}, f, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write scan cache {cache_path}: {e}")
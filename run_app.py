@@ -9,11 +9,20 @@ import os
 import sys
 import subprocess
 import logging
-import time
+import mmap
+import re
+import selectors
 import signal
+import threading
 import json
 import importlib.util
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+from repo_scan import (
+    SKIP_DIRS, SCAN_WORKERS, list_tracked_files,
+    scan_cache_version, load_scan_cache, save_scan_cache
+)
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +34,27 @@ logger = logging.getLogger('CoreShareRunner')
 
 REPO_DIR = "CoreShare"
 
+# Route decorators and the keywords that mark a file as serving the chatbot
+ROUTE_RE = re.compile(rb'@(?:app|blueprint)\.route\(\s*[\'"]([^\'"]+)', re.IGNORECASE)
+ENDPOINT_KEYWORD_RE = re.compile(rb'chat|cori|bot|message', re.IGNORECASE)
+
+# Priority patterns for app entry points
+ENTRY_POINT_PATTERNS = (
+    "app.py", "main.py", "server.py", "run.py", "wsgi.py", 
+    "application.py", "index.py", "start.py"
+)
+
+# Signs that a file creates a Flask application object
+FLASK_IMPORT_RE = re.compile(rb'from flask import|import flask', re.IGNORECASE)
+FLASK_APP_RE = re.compile(rb'(?:app|application) = flask', re.IGNORECASE)
+
+# Cached results are only reused while all patterns used by scan_python_file are unchanged
+PYTHON_SCAN_VERSION = scan_cache_version(ROUTE_RE, ENDPOINT_KEYWORD_RE, FLASK_IMPORT_RE, FLASK_APP_RE)
+
+# Application output is read in chunks as soon as either pipe has data
+OUTPUT_CHUNK_SIZE = 65536
+OUTPUT_POLL_SECONDS = 0.5
+
 def load_module_from_path(module_name, file_path):
     """Dynamically load a Python module from file path."""
     spec = importlib.util.spec_from_file_location(module_name, file_path)
@@ -39,53 +69,149 @@ def load_module_from_path(module_name, file_path):
         logger.error(f"Error loading module {module_name} from {file_path}: {e}")
         return None
 
-def find_app_files():
-    """Find potential application entry points in the repository."""
-    app_files = []
+def scan_python_file(file_path):
+    """Read a Python file once; return whether it imports Flask, whether it creates a Flask app and its chatbot routes."""
+    try:
+        with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            imports_flask = FLASK_IMPORT_RE.search(mm) is not None
+            is_flask_app = imports_flask and FLASK_APP_RE.search(mm) is not None
+            # Routes and the chatbot keywords are matched by separate regexes:
+            # the keyword search stops at the first hit and only runs when the
+            # file has routes, which is cheaper than one combined pattern
+            routes = ROUTE_RE.findall(mm)
+            if routes and ENDPOINT_KEYWORD_RE.search(mm):
+                return imports_flask, is_flask_app, [route.decode('utf-8', errors='ignore') for route in routes]
+            return imports_flask, is_flask_app, []
+    except Exception:
+        # Skip files that can't be mapped (e.g. empty files)
+        return False, False, []
+
+def find_entry_points():
+    """Look for entry points where they usually live: the repo root, src/ or a top-level package."""
+    locations = [REPO_DIR, os.path.join(REPO_DIR, "src")]
+    try:
+        with os.scandir(REPO_DIR) as entries:
+            locations.extend(sorted(
+                entry.path for entry in entries
+                if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "__init__.py"))
+            ))
+    except OSError:
+        pass
+    
+    for location in locations:
+        entry_points = [
+            os.path.join(location, pattern) for pattern in ENTRY_POINT_PATTERNS
+            if os.path.isfile(os.path.join(location, pattern))
+        ]
+        if entry_points:
+            return entry_points
+    return []
+
+def collect_python_files(path, python_files, mtimes, entry_points):
+    """List Python files under path, with their mtimes, into parallel lists, and the entry points among them."""
+    subdirectories = []
+    names = set()
+    with os.scandir(path) as entries:
+        for entry in entries:
+            # Symlinks are skipped so links can't create cycles
+            if entry.is_symlink():
+                continue
+            if entry.is_dir():
+                if entry.name not in SKIP_DIRS:
+                    subdirectories.append(entry.path)
+            elif entry.name.endswith('.py'):
+                try:
+                    mtime = entry.stat().st_mtime_ns
+                except OSError:
+                    # Removed since it was listed
+                    continue
+                python_files.append(entry.path)
+                mtimes.append(mtime)
+                names.add(entry.name)
+    
+    # Entry points keep their priority order within each directory
+    entry_points.extend(os.path.join(path, pattern) for pattern in ENTRY_POINT_PATTERNS if pattern in names)
     
-    # Priority patterns for app entry points
-    entry_point_patterns = [
-        "app.py", "main.py", "server.py", "run.py", "wsgi.py", 
-        "application.py", "index.py", "start.py"
+    for subdirectory in subdirectories:
+        collect_python_files(subdirectory, python_files, mtimes, entry_points)
+
+def collect_tracked_python_files(tracked, python_files, mtimes, entry_points):
+    """Like collect_python_files, but from a list of tracked file paths."""
+    names_by_directory = {}
+    for file_path in tracked:
+        if not file_path.endswith('.py'):
+            continue
+        try:
+            mtime = os.stat(file_path).st_mtime_ns
+        except OSError:
+            # Tracked but deleted from the working tree
+            continue
+        python_files.append(file_path)
+        mtimes.append(mtime)
+        directory, _, name = file_path.rpartition(os.sep)
+        names_by_directory.setdefault(directory, set()).add(name)
+    
+    # Entry points keep their priority order within each directory
+    for directory, names in names_by_directory.items():
+        entry_points.extend(os.path.join(directory, pattern) for pattern in ENTRY_POINT_PATTERNS if pattern in names)
+
+def scan_repo():
+    """Walk the repository once and collect app entry points and chatbot endpoints."""
+    # Phase 1: list the files, noting entry point names anywhere in the tree
+    python_files = []
+    mtimes = []
+    entry_points = []
+    # Git's file list is authoritative for a clone; walk the tree otherwise
+    tracked = list_tracked_files(REPO_DIR)
+    if tracked is not None:
+        collect_tracked_python_files(tracked, python_files, mtimes, entry_points)
+    else:
+        collect_python_files(REPO_DIR, python_files, mtimes, entry_points)
+    
+    # Only files that are new or changed since the last run are read again
+    cached = load_scan_cache(REPO_DIR, "python-files", PYTHON_SCAN_VERSION)
+    # Every listed path starts with REPO_DIR, so slicing it off is enough;
+    # os.path.relpath would resolve both paths against the cwd for each file
+    prefix_len = len(os.path.join(REPO_DIR, ""))
+    rel_paths = [file_path[prefix_len:] for file_path in python_files]
+    stale = [
+        file_path for file_path, rel_path, mtime in zip(python_files, rel_paths, mtimes)
+        if cached.get(rel_path, [None])[0] != mtime
     ]
     
-    # Look for exact matches first
-    for root, _, files in os.walk(REPO_DIR):
-        for pattern in entry_point_patterns:
-            if pattern in files:
-                app_files.append(os.path.join(root, pattern))
+    # Phase 2: each stale file is read once, in parallel, for both the
+    # Flask app check and the route scan
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+        scanned = dict(zip(stale, executor.map(scan_python_file, stale)))
     
-    # If no exact matches, look for Flask app files
-    if not app_files:
-        for root, _, files in os.walk(REPO_DIR):
-            for file in files:
-                if not file.endswith('.py'):
-                    continue
-                    
-                file_path = os.path.join(root, file)
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read().lower()
-                        if ("from flask import" in content or "import flask" in content) and (
-                                "app = flask" in content or "application = flask" in content):
-                            app_files.append(file_path)
-                except Exception:
-                    pass
-    
-    return app_files
-
-def check_for_flask_app(file_path):
-    """Check if a file contains a Flask application."""
-    try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read().lower()
-            return "from flask import" in content or "import flask" in content
-    except Exception:
-        return False
+    flask_files = set()
+    flask_apps = []
+    endpoints = []
+    results = {}
+    for file_path, rel_path, mtime in zip(python_files, rel_paths, mtimes):
+        imports_flask, is_flask_app, routes = scanned[file_path] if file_path in scanned else cached[rel_path][1:]
+        results[rel_path] = [mtime, imports_flask, is_flask_app, routes]
+        if imports_flask:
+            flask_files.add(file_path)
+        if is_flask_app:
+            flask_apps.append(file_path)
+        endpoints.extend(routes)
+    
+    if results != cached:
+        save_scan_cache(REPO_DIR, "python-files", PYTHON_SCAN_VERSION, results)
+    
+    return {
+        # Entry points at the usual locations win, then entry points elsewhere
+        # in the tree; otherwise fall back to Flask app files
+        'app_files': find_entry_points() or entry_points or flask_apps,
+        'endpoints': endpoints,
+        # Files importing Flask, which are started with host and port arguments
+        'flask_files': flask_files,
+    }
 
-def find_run_command(file_path):
+def find_run_command(file_path, is_flask_app):
     """Find the command to run the application."""
-    if check_for_flask_app(file_path):
+    if is_flask_app:
         # For Flask apps, use a standard command to ensure proper binding
         return [
             sys.executable, 
@@ -97,42 +223,69 @@ def find_run_command(file_path):
         # For non-Flask apps, simply run the file
         return [sys.executable, file_path]
 
-def run_application(file_path):
-    """Run the application with the specified file as entry point."""
-    os.chdir(Path(file_path).parent)
+def copy_output(pipe, stream):
+    """Copy a pipe to an output stream in chunks until the pipe is closed."""
+    while True:
+        data = os.read(pipe.fileno(), OUTPUT_CHUNK_SIZE)
+        if not data:
+            return
+        stream.flush()
+        stream.buffer.write(data)
+        stream.buffer.flush()
+
+def forward_output(process):
+    """Pass the application's stdout and stderr through until it closes both pipes."""
+    pipes = ((process.stdout, sys.stdout), (process.stderr, sys.stderr))
+    if os.name == 'nt':
+        # Windows can't select on pipes, so each pipe gets a reader thread.
+        # The joins time out so Ctrl+C is still delivered to this thread
+        readers = [threading.Thread(target=copy_output, args=pipe, daemon=True) for pipe in pipes]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            while reader.is_alive():
+                reader.join(OUTPUT_POLL_SECONDS)
+        return
     
-    command = find_run_command(file_path)
+    # Wait on both pipes and pass whatever arrives straight through
+    with selectors.DefaultSelector() as selector:
+        for pipe, stream in pipes:
+            selector.register(pipe, selectors.EVENT_READ, stream)
+        while selector.get_map():
+            for key, _ in selector.select(timeout=OUTPUT_POLL_SECONDS):
+                data = os.read(key.fd, OUTPUT_CHUNK_SIZE)
+                if not data:
+                    # EOF: the application closed this pipe
+                    selector.unregister(key.fileobj)
+                    continue
+                key.data.flush()
+                key.data.buffer.write(data)
+                key.data.buffer.flush()
+
+def run_application(file_path, is_flask_app=False):
+    """Run the application with the specified file as entry point."""
+    # The app runs from its own directory; the path is made absolute so it
+    # still resolves from there
+    file_path = os.path.abspath(file_path)
+    command = find_run_command(file_path, is_flask_app)
     logger.info(f"Running application with command: {' '.join(command)}")
     
+    process = None
     try:
         # Start the application as a subprocess
         process = subprocess.Popen(
             command,
+            cwd=Path(file_path).parent,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            universal_newlines=True,
-            bufsize=1
+            bufsize=0  # Pipes are read with os.read, so no buffered reader is needed
         )
         
         # Handle output in real-time
         logger.info("Application started. Press Ctrl+C to stop.")
+        forward_output(process)
         
-        while True:
-            output = process.stdout.readline()
-            if output:
-                print(output.strip())
-            
-            error = process.stderr.readline()
-            if error:
-                print(f"ERROR: {error.strip()}", file=sys.stderr)
-            
-            # Check if process has terminated
-            if process.poll() is not None:
-                break
-            
-            time.sleep(0.1)
-        
-        return_code = process.poll()
+        return_code = process.wait()
         
         if return_code == 0:
             logger.info("Application exited successfully.")
@@ -143,43 +296,27 @@ def run_application(file_path):
     
     except KeyboardInterrupt:
         logger.info("Stopping application...")
-        process.send_signal(signal.SIGINT)
-        try:
-            process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            process.kill()
+        if process is not None:
+            # SIGINT can't be sent to a process on Windows
+            if os.name == 'nt':
+                process.terminate()
+            else:
+                process.send_signal(signal.SIGINT)
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
         
         return True
     except Exception as e:
         logger.error(f"Error running application: {e}")
+        # Don't leave the application running when forwarding its output failed
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
         return False
 
-def try_find_chatbot_endpoints():
-    """Try to find endpoints related to the chatbot."""
-    endpoints = []
-    
-    for root, _, files in os.walk(REPO_DIR):
-        for file in files:
-            if not file.endswith('.py'):
-                continue
-                
-            file_path = os.path.join(root, file)
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read().lower()
-                    if ("@app.route" in content or "@blueprint.route" in content) and (
-                            "chat" in content or "cori" in content or "bot" in content or "message" in content):
-                        # Found a potential endpoint
-                        lines = content.split('\n')
-                        for i, line in enumerate(lines):
-                            if "@app.route" in line or "@blueprint.route" in line:
-                                route = line.split("route(")[1].split(")")[0].strip().strip("'").strip('"')
-                                endpoints.append(route)
-            except Exception:
-                pass
-    
-    return endpoints
-
 def main():
     """Main function to run the CoreShare application."""
     logger.info("Starting CoreShare application runner...")
@@ -188,15 +325,17 @@ def main():
         logger.error(f"Repository directory {REPO_DIR} not found. Run clone_and_setup.py first.")
         return False
     
-    app_files = find_app_files()
+    scan = scan_repo()
+    app_files = scan['app_files']
     
     if not app_files:
         logger.error("Could not find any application entry points in the repository.")
         return False
     
     logger.info(f"Found {len(app_files)} potential application entry points:")
-    for i, file_path in enumerate(app_files):
-        logger.info(f"  {i+1}. {file_path}")
+    if logger.isEnabledFor(logging.INFO):
+        for i, file_path in enumerate(app_files):
+            logger.info(f"  {i+1}. {file_path}")
     
     selected_index = 0
     if len(app_files) > 1:
@@ -213,14 +352,16 @@ def main():
     logger.info(f"Selected application: {selected_file}")
     
     # Try to find chatbot endpoints
-    endpoints = try_find_chatbot_endpoints()
+    endpoints = scan['endpoints']
     if endpoints:
         logger.info("Found potential chatbot endpoints that should be available when the app is running:")
-        for endpoint in endpoints:
-            logger.info(f"  - {endpoint}")
+        if logger.isEnabledFor(logging.INFO):
+            for endpoint in endpoints:
+                logger.info(f"  - {endpoint}")
     
     # Run the application
-    success = run_application(selected_file)
+    # The scan already read the file, so it isn't opened again to check for Flask
+    success = run_application(selected_file, selected_file in scan['flask_files'])
     
     return success
 